@@ -53,6 +53,11 @@ class ActiveStyle(Enum):
 	DashedOutline = tk.DOTBOX
 
 
+class Backend(Enum):
+	Classic = 'classic'
+	Ttk = 'ttk'
+
+
 # ---
 class BaseWidgetName(Enum):
 	pass
@@ -69,6 +74,8 @@ class WidgetName(BaseWidgetName):
 	Slider = 'slider'
 	ListBox = 'list-box'
 	Canvas = 'canvas'
+	DataGrid = 'data-grid'
+	LogView = 'log-view'
 
 
 class CompoundWidgetName(BaseWidgetName):
@@ -92,3 +99,21 @@ class CapStyle(Enum):
 	Round = 'round'
 	Projecting = 'projecting'
 	Ass = 'butt'
+
+
+class BindingMode(Enum):
+	TwoWay = 'two_way'
+	ToWidget = 'to_widget'
+	ToModel = 'to_model'
+
+
+class EventRate(Enum):
+	Throttle = 'throttle'  # at most one call per interval (the first and the last events get through)
+	Debounce = 'debounce'  # one call once the events stopped for an interval
+	Latest = 'latest'  # one call per event-loop turn, with the latest event
+
+
+class FilterMode(Enum):
+	Prefix = 'prefix'
+	Substring = 'substring'
+	Fuzzy = 'fuzzy'  # the query's characters in order, anything in between
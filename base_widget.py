@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Tuple, Dict, Type, Any, TypedDict, List
+from typing import Tuple, Dict, Type, Any, TypedDict, List, Iterable, Callable
 
-from base_types import Side, Fill, Anchor, TkWidget, BaseWidgetName
+from base_types import Side, Fill, Anchor, TkWidget, BaseWidgetName, EventRate
 from object import Object
-from style import BaseWidgetStyle
+from scheduler import RateLimiter
+from style import BaseWidgetStyle, StyleOverlay, style_schema
+from tracing import TRACER
+from utils import type_validator
 
 
 # ---
@@ -22,6 +25,62 @@ class PlaceProperties:
 	size: Tuple[int, int]
 
 
+@dataclass
+class EventBinding:
+	sequence: str
+	listener: Callable
+	func_id: str | None = None  # of the Tk binding, while rendered
+
+
+# ---
+class TclCallCounter:
+	"""
+	Counts the Tcl calls made by `BaseWidget.render`: creating the Tk widget, configuring and styling it, binding
+	events, ... (placing it is done by the layout, after the render).
+
+	The count is read from the interpreter (`info cmdcount`) before and after each render, so every call is included,
+	also the ones Tk's own scripts make for them. Disabled by default, since reading it is itself a Tcl call. When
+	`TRACER` is enabled too, every render adds its count to the `tcl_calls` counter of the tracer.
+	"""
+
+	def __init__(self):
+		self.enabled = False
+		self.count = 0
+		self.last = 0  # of the last render
+
+		self._overhead: int | None = None  # of reading the count twice
+
+	def enable(self):
+		self.enabled = True
+
+	def disable(self):
+		self.enabled = False
+
+	def reset(self) -> int:
+		"""Resets the counter and returns the count up to now."""
+
+		count, self.count = self.count, 0
+
+		return count
+
+	# ---
+	def begin(self, tk_app) -> int:
+		if self._overhead is None:
+			self._overhead = -tk_app.call('info', 'cmdcount') + tk_app.call('info', 'cmdcount')
+
+		return tk_app.call('info', 'cmdcount')
+
+	def end(self, tk_app, start: int):
+		self.last = tk_app.call('info', 'cmdcount') - start - self._overhead
+		self.count += self.last
+
+		if TRACER.enabled:
+			TRACER.count('tcl_calls', self.last)
+
+
+TCL_CALLS = TclCallCounter()
+
+
 # ---
 class BaseWidgetProperty(TypedDict):
 	name: str
@@ -29,27 +88,196 @@ class BaseWidgetProperty(TypedDict):
 	default: Any
 
 
+_NO_DEFAULT = object()
+
+
+def unbind_tk(tk_widget: TkWidget, sequence: str, func_id: str):
+	"""
+	Removes one listener bound with `bind(..., add='+')`.
+
+	`tk_widget.unbind(sequence, func_id)` removes all the bindings of the sequence (before Python 3.13), this only
+	removes the line of the script calling `func_id`.
+	"""
+
+	script = tk_widget.bind(sequence)
+	call = f'"[{func_id} '
+
+	tk_widget.bind(sequence, '\n'.join(_ for _ in script.split('\n') if call not in _))
+	tk_widget.deletecommand(func_id)
+
+
+class CompiledProperty:
+	"""A property declaration of a widget class, compiled once when the class is created."""
+
+	__slots__ = ('name', 'type', 'default', 'tk_name', 'attr', 'config', 'setter', 'validator')
+
+	def __init__(self, widget_class: type, ppt: BaseWidgetProperty):
+		self.name: str = ppt['name']
+		self.type: Type = ppt['type']
+		self.default: Any = ppt.get('default', _NO_DEFAULT)
+		self.tk_name: str | None = ppt.get('tk_name')
+
+		# the attribute holding the value
+		self.attr = f'_ppt_{self.name}'
+
+		# custom implementation configuring the property (see `Widget.tk_config_options`)
+		self.config: Callable[[Any], Dict[str, Any] | None] | None = None
+
+		if ppt.get('custom_implementation', False):
+			custom_func_name = f'config_{self.name}'
+			self.config = getattr(widget_class, custom_func_name, None)
+
+			if self.config is None:
+				raise Exception(f'\'{widget_class.__name__}\' must have function \'{custom_func_name}\' to configure the property \'{self.name}\'.')
+
+		# the Python property of the same name, if any, handles writes (e.g. values held by Tk variables)
+		python_property = getattr(widget_class, self.name, None)
+		self.setter: Callable[[Any, Any], None] | None = python_property.fset if isinstance(python_property, property) else None
+
+		self.validator = type_validator(self.type)
+
+	@property
+	def has_default(self) -> bool:
+		return self.default is not _NO_DEFAULT
+
+	def set(self, widget: 'BaseWidget', value: Any):
+		if self.setter is not None:
+			self.setter(widget, value)
+		else:
+			setattr(widget, self.attr, value)
+
+
 class BaseWidget(Object, ABC):
 	name: BaseWidgetName
-	properties: Dict[str, BaseWidgetProperty]
+	properties: List[BaseWidgetProperty]
+	property_table: Dict[str, CompiledProperty] = {}
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+
+		cls.property_table = {ppt['name']: CompiledProperty(cls, ppt) for ppt in getattr(cls, 'properties', [])}
 
 	# ---
 	@property
 	def style(self) -> BaseWidgetStyle:
 		return self._style
 
+	@property
+	def uses_theme_style(self) -> bool:
+		"""Whether the widget uses its theme's style unchanged (and can use the theme's compiled tables)."""
+
+		style = self._style
+
+		return isinstance(style, StyleOverlay) and not style.overridden and style.base is self.theme.base(self.name)
+
 	@property
 	def rendered(self) -> bool:
 		return self._rendered
 
 	# constructor
 	def __init__(self, parent: Object = None, style: BaseWidgetStyle = None):
+		tracing = TRACER.enabled
+
+		if tracing:
+			start = TRACER.begin()
+
 		super().__init__(parent)
 
 		self._style = style if style is not None else self.theme.get(self.name)
 		self._rendered = False
-		self._visible = False
+		self._visible = True  # requested, kept across renders
+		self._geometry: Tuple[str, Dict[str, Any], List[TkWidget]] | None = None
 		self._tk_widget = None
+		self._watchers: Dict[str, List[Callable[[Any], None]]] = {}
+		self._bindings: List[EventBinding] = []
+
+		if tracing:
+			TRACER.end('construct', self, start)
+
+	# ---
+	def spacing(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+		"""Returns the resolved (margin, padding) of the widget."""
+
+		if self.uses_theme_style:
+			return self.theme.compiled.spacing(self.name)
+
+		theme = self.theme
+
+		return theme.margin_(self.style.margin), theme.margin_(self.style.padding)
+
+	def watch(self, ppt_name: str, listener: Callable[[Any], None], rate: EventRate = None, interval: int = 50) -> Callable[[], None]:
+		"""
+		Calls `listener` with the new value whenever the property changes on the Tk side (e.g. user input). Returns a
+		function removing it.
+
+		:param rate: Limits how often the listener is called (see `EventRate`).
+		:param interval: Throttling/debouncing interval (ms).
+		"""
+
+		if rate is not None:
+			listener = RateLimiter(self.window.tk_win, listener, rate, interval)
+
+		self._watchers.setdefault(ppt_name, []).append(listener)
+
+		def unwatch():
+			listeners = self._watchers.get(ppt_name)
+
+			if listeners is not None and listener in listeners:
+				listeners.remove(listener)
+
+			if isinstance(listener, RateLimiter):
+				listener.cancel()
+
+		return unwatch
+
+	def bind(self, sequence: str, listener: Callable[[Any], Any], rate: EventRate = None, interval: int = 50) -> Callable[[], None]:
+		"""
+		Binds a listener to a Tk event (e.g. '<B1-Motion>') of the widget, kept across renders. Returns a function
+		unbinding it.
+
+		:param rate: Limits how often the listener is called (see `EventRate`).
+		:param interval: Throttling/debouncing interval (ms).
+		"""
+
+		if rate is not None:
+			listener = RateLimiter(self.window.tk_win, listener, rate, interval)
+
+		binding = EventBinding(sequence, listener)
+		self._bindings.append(binding)
+
+		if self._rendered:
+			binding.func_id = self._tk_widget.bind(sequence, listener, add='+')
+
+		def unbind():
+			if binding not in self._bindings:
+				return
+
+			self._bindings.remove(binding)
+
+			if binding.func_id is not None:
+				unbind_tk(self._tk_widget, sequence, binding.func_id)
+				binding.func_id = None
+
+			if isinstance(listener, RateLimiter):
+				listener.cancel()
+
+		return unbind
+
+	def notify_watchers(self, ppt_name: str):
+		listeners = self._watchers.get(ppt_name)
+
+		if not listeners:
+			return
+
+		value = getattr(self, ppt_name)
+
+		for listener in list(listeners):
+			listener(value)
+
+	def iter_children(self) -> Iterable['BaseWidget']:
+		"""Returns the direct child widgets (of compound widgets)."""
+
+		return ()
 
 	# Tk compatibility
 	@abstractmethod
@@ -74,30 +302,223 @@ class BaseWidget(Object, ABC):
 		if self._tk_widget is None:
 			return
 
+	def apply_tk_options(self, options: Dict[str, Any]):
+		"""Applies Tk options to self._tk_widget in a single `configure` call."""
+
+		if not options:
+			return
+
+		self._tk_widget.configure(**options)
+
+	def restyle(self, diff_cache: Dict = None):
+		"""
+		Re-applies the style after the theme or the style changed, configuring only the Tk options that differ.
+
+		:param diff_cache: Shared between the widgets of one update to compute each distinct diff only once.
+		"""
+
+		if isinstance(self._style, StyleOverlay):
+			self._style.rebase(self.theme.base(self.name))
+
 	def render(self, tk_parent: TkWidget) -> TkWidget:
 		if self._rendered:
 			raise Exception('Widget is already rendered!')
 
-		self.create_tk_widget(tk_parent)
+		counting = TCL_CALLS.enabled
+
+		if counting:
+			tk_app = tk_parent.tk
+			calls_start = TCL_CALLS.begin(tk_app)
+
+		tracing = TRACER.enabled
 
-		self.post_create()
+		if not tracing:
+			if not self.reuse_tk_widget(tk_parent):
+				self.create_tk_widget(tk_parent)
 
-		self.config_tk_widget()
-		self.style_tk_widget()
+			self.post_create()
+
+			self.config_tk_widget()
+			self.style_tk_widget()
+		else:
+			start = TRACER.begin()
+
+			if not self.reuse_tk_widget(tk_parent):
+				self.create_tk_widget(tk_parent)
+
+			self.post_create()
+			TRACER.end('create', self, start)
+
+			config_start = TRACER.begin()
+			self.config_tk_widget()
+			TRACER.end('config', self, config_start)
+
+			style_start = TRACER.begin()
+			self.style_tk_widget()
+			TRACER.end('style', self, style_start)
+
+			TRACER.end('render', self, start)
+
+		for binding in self._bindings:
+			binding.func_id = self._tk_widget.bind(binding.sequence, binding.listener, add='+')
+
+		if counting:
+			TCL_CALLS.end(tk_app, calls_start)
 
 		self._rendered = True
+		self._geometry = None
 
-		self.show()
+		if not self._visible:
+			# hidden before the render: removed once the caller placed it, before Tk displays it
+			self.window.flusher.defer((self, 'visibility'), self.sync_visibility)
 
 		return self._tk_widget
 
+	def unrender(self):
+		"""
+		Detaches the widget from its Tk widget, which is pooled for reuse (see `release_tk_widget`) or destroyed.
+
+		The widget keeps its properties and style and can be rendered again (see `rerender`).
+		"""
+
+		if not self._rendered:
+			return
+
+		tk_widget = self._tk_widget
+
+		for binding in self._bindings:
+			if binding.func_id is not None:
+				unbind_tk(tk_widget, binding.sequence, binding.func_id)
+				binding.func_id = None
+
+			if isinstance(binding.listener, RateLimiter):
+				binding.listener.cancel()
+
+		style_options = self.detach()
+
+		if not self.release_tk_widget(tk_widget, style_options):
+			tk_widget.destroy()
+
+	def rerender(self, tk_parent: TkWidget) -> TkWidget:
+		"""Renders the widget again, e.g. into another container."""
+
+		self.unrender()
+
+		return self.render(tk_parent)
+
+	def detach(self) -> Any:
+		"""
+		Resets the render state of the widget (and its children) without any Tk call.
+
+		Returns the style options the Tk widget is left with.
+		"""
+
+		for child in self.iter_children():
+			child.detach()
+
+		flusher = self.window.flusher
+		flusher.cancel(self)
+		flusher.cancel((self, 'visibility'))
+
+		self._tk_widget = None
+		self._rendered = False
+		self._geometry = None
+
+		return None
+
+	def reuse_tk_widget(self, tk_parent: TkWidget) -> bool:
+		"""Takes a pooled Tk widget as self._tk_widget instead of creating one. Returns whether it did."""
+
+		return False
+
+	def release_tk_widget(self, tk_widget: TkWidget, style_options: Any) -> bool:
+		"""Pools a detached Tk widget for reuse. Returns False if it was not (the caller destroys it)."""
+
+		return False
+
 	# visibility
 	def hide(self):
+		"""
+		Removes the widget from its geometry manager (pack, place or grid), remembering how it was placed.
+
+		Applied on the window's next idle flush, so that hiding or showing many widgets costs one layout pass. A widget
+		hidden before it is rendered is removed right after it is placed.
+		"""
+
+		if not self._visible:
+			return
+
 		self._visible = False
 
+		if self._rendered:
+			self.window.flusher.defer((self, 'visibility'), self.sync_visibility)
+
 	def show(self):
+		"""Places the hidden widget again, as it was, with a single geometry call (see `hide`)."""
+
+		if self._visible:
+			return
+
 		self._visible = True
 
+		if self._rendered:
+			self.window.flusher.defer((self, 'visibility'), self.sync_visibility)
+
+	def sync_visibility(self):
+		"""Applies the visibility to the Tk widget now."""
+
+		tk_widget = self._tk_widget
+
+		if tk_widget is None:
+			return
+
+		if self._visible:
+			if self._geometry is None:
+				return
+
+			manager, options, following = self._geometry
+			self._geometry = None
+
+			if manager == 'pack':
+				# back to its place in the packing order, before the first following sibling still packed
+				for sibling in following:
+					if sibling.winfo_exists() and sibling.winfo_manager() == 'pack':
+						options['before'] = sibling
+						break
+
+			getattr(tk_widget, f'{manager}_configure')(options)
+
+		elif self._geometry is None:
+			manager = tk_widget.winfo_manager()
+
+			if manager not in ('pack', 'place', 'grid'):
+				return
+
+			options = getattr(tk_widget, f'{manager}_info')()
+			following = []
+
+			if manager == 'pack':
+				slaves = options['in'].pack_slaves()
+
+				if tk_widget in slaves:
+					following = slaves[slaves.index(tk_widget) + 1:]
+
+			self._geometry = (manager, options, following)
+
+			getattr(tk_widget, f'{manager}_forget')()
+
+	def configure_geometry(self, **options):
+		"""Changes options of the geometry manager (e.g. padding), kept for when it is shown again if hidden."""
+
+		if self._geometry is not None:
+			self._geometry[1].update(options)
+			return
+
+		manager = self._tk_widget.winfo_manager()
+
+		if manager:
+			getattr(self._tk_widget, f'{manager}_configure')(options)
+
 	@property
 	def visible(self) -> bool:
 		return self._visible
@@ -108,3 +529,28 @@ class BaseWidget(Object, ABC):
 			self.show()
 		else:
 			self.hide()
+
+
+# ---
+def update_many(widgets: Iterable[BaseWidget], **changes):
+	"""
+	Applies the same style changes to many widgets.
+
+	The changes are validated once per style class, rendered widgets are then reconfigured with only the Tk options
+	that changed.
+	"""
+
+	checked: Dict[type, Dict[str, Any]] = {}
+	diff_cache = {}
+
+	for widget in widgets:
+		style = widget._style
+		style_class = type(style.base) if isinstance(style, StyleOverlay) else type(style)
+
+		style_changes = checked.get(style_class)
+
+		if style_changes is None:
+			style_changes = checked[style_class] = style_schema(style_class).check(**changes)
+
+		style.apply(style_changes)
+		widget.restyle(diff_cache)
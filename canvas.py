@@ -47,6 +47,8 @@ class Canvas(Widget):
 	name = WidgetName.Canvas
 	properties = []
 	supported_styles = SupportedStyles(True, False, False, True, True, True, True, True, True, True)
+	tk_class = 'Canvas'
+	poolable = False  # its drawings belong to the Tk widget
 
 	# ---
 	def create_tk_widget(self, tk_parent: TkWidget):
@@ -149,7 +151,7 @@ class Canvas(Widget):
 		self._tk_widget.create_text(
 			pt.x, pt.y,
 			text=txt,
-			font=font,
+			font=self.window.fonts.name(font),
 			fill=self.theme.color_(color),
 			anchor='nw'
 		)
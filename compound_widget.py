@@ -1,10 +1,11 @@
 import tkinter as tk
 from abc import ABC
-from typing import List
+from typing import List, Iterable
 
-from base_types import TkWidget, Side, Fill, Orientation, CompoundWidgetName
+from base_types import TkWidget, Side, Fill, Orientation, CompoundWidgetName, EventRate
 from base_widget import BaseWidget, BaseWidgetProperty
 from object import Object
+from scheduler import RateLimiter
 from style import CompoundWidgetStyle
 from widget import Widget, RadioButton
 
@@ -45,10 +46,15 @@ class RadioButtonGroup(CompoundWidget):
 
 		self._options = []
 		self._orientation = orientation
-		self._value = tk.StringVar(value=default if default is not None else options[0])
+		# shared by the radio buttons, created when rendered
+		self._value = default if default is not None else options[0]
+		self._tk_var: tk.StringVar | None = None
 
 		self.set_options(options)
 
+	def iter_children(self) -> Iterable[BaseWidget]:
+		return self._radio_btns
+
 	def create_tk_widget(self, tk_parent: TkWidget):
 		self._tk_widget = tk.Frame(tk_parent)
 
@@ -57,7 +63,11 @@ class RadioButtonGroup(CompoundWidget):
 		else:
 			side = Side.Left
 
+		self._tk_var = tk.StringVar(self._tk_widget, self._value)
+		self._tk_var.trace_add('write', self._on_tk_var_write)
+
 		for radio_btn in self._radio_btns:
+			radio_btn.update(variable=self._tk_var)
 			radio_btn.render(self._tk_widget).pack(side=side.value)
 
 	def config_tk_widget(self, which_ones: List[str] = None):
@@ -66,17 +76,30 @@ class RadioButtonGroup(CompoundWidget):
 	def style_tk_widget(self):
 		pass
 
+	def detach(self):
+		self._tk_var = None
+
+		return super().detach()
+
+	def _on_tk_var_write(self, *_):
+		self._value = self._tk_var.get()
+
+		self.notify_watchers('value')
+
 	@property
 	def value(self) -> str:
-		return self._value.get()
+		return self._value
 
 	@value.setter
 	def value(self, value: str):
-		self._value.set(value)
+		self._value = value
+
+		if self._tk_var is not None:
+			self._tk_var.set(value)
 
 	def set_options(self, options: List[str]):
 		self._options = options
-		self._radio_btns = [RadioButton(parent=self, text=option, value=option, variable=self._value) for option in self._options]
+		self._radio_btns = [RadioButton(parent=self, text=option, value=option, variable=self._tk_var) for option in self._options]
 
 
 class Scrollable(CompoundWidget):
@@ -100,6 +123,9 @@ class Scrollable(CompoundWidget):
 	def add_widget(self, widget: Widget | CompoundWidget):
 		self._children.append(widget)
 
+	def iter_children(self) -> Iterable[BaseWidget]:
+		return self._children
+
 	def create_tk_widget(self, tk_parent: TkWidget):
 		self._tk_widget = tk.Frame(tk_parent)
 
@@ -120,15 +146,13 @@ class Scrollable(CompoundWidget):
 
 		_scroll_bar.update_idletasks()
 
+		_sub_frame_item = _canvas.create_window((0, 0), window=_sub_frame, height=h, anchor='nw')
+
 		def on_update(_):
-			_canvas.create_window(
-				(0, 0),
-				window=_sub_frame,
-				width=self._tk_widget.winfo_width() - _scroll_bar.winfo_width(), height=h,
-				anchor='nw'
-			)
-
-		self._tk_widget.bind('<Configure>', on_update)
+			_canvas.itemconfigure(_sub_frame_item, width=self._tk_widget.winfo_width() - _scroll_bar.winfo_width())
+
+		# resizing fires <Configure> on every step, the sub frame only needs the latest size
+		self._tk_widget.bind('<Configure>', RateLimiter(self.window.tk_win, on_update, EventRate.Latest))
 		_canvas.bind_all('<MouseWheel>', lambda evt: _canvas.yview_scroll(-int(evt.delta / 60), 'units'))
 
 	def config_tk_widget(self, which_ones: List[str] = None):
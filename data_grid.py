@@ -0,0 +1,601 @@
+import array
+import bisect
+import itertools
+import tkinter as tk
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Sequence, Tuple
+
+from base_types import TkWidget, WidgetName, EventRate
+from canvas import Canvas
+from scheduler import RateLimiter
+from style import ResolvedStyle
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+def compact_column(values: Sequence) -> Sequence:
+	"""
+	Stores a column of numbers as a typed array (NumPy if available, else `array.array`), 8 bytes per value instead of a
+	list of Python objects. Other columns (and already typed ones) are returned as they are.
+	"""
+
+	if isinstance(values, (array.array, range)) or (np is not None and isinstance(values, np.ndarray)):
+		return values
+
+	types = set(map(type, values))
+
+	if types <= {int}:
+		typecode = 'q'
+	elif types <= {int, float}:
+		typecode = 'd'
+	else:
+		return values
+
+	try:
+		if np is not None:
+			return np.array(values, dtype=np.int64 if typecode == 'q' else np.float64)
+
+		return array.array(typecode, values)
+	except OverflowError:
+		return values
+
+
+def argsort(keys: Sequence) -> Sequence[int]:
+	"""Returns the (stable) order of the indices of `keys` sorting them."""
+
+	if np is not None and isinstance(keys, (np.ndarray, array.array)):
+		return np.argsort(np.asarray(keys), kind='stable')
+
+	return array.array('q', sorted(range(len(keys)), key=keys.__getitem__))
+
+
+@dataclass
+class Column:
+	name: str
+	values: Sequence  # see `compact_column`
+	width: int = 100  # px
+	fmt: Callable[[Any], str] = str
+	sort_key: Sequence | None = None  # precomputed keys to sort the rows by, the values if None
+
+
+class DataGrid(Canvas):
+	"""
+	A table of columns, drawn on a canvas.
+
+	Data is stored column by column and only the cells in view are drawn. The canvas items of a row are reused as the
+	view scrolls: scrolling by a few rows moves the rows still in view and refills the ones that came around, so a frame
+	costs a handful of Tk calls per new row whatever the number of rows. Sorting uses an order array computed once per
+	column (from `Column.sort_key` when given), the data itself is never moved.
+
+	Colors and font come from the style: `background`/`foreground` for the cells, `background_active`/
+	`foreground_active` for the header and `background_select`/`foreground_select` for the selected row. Columns are
+	resized by dragging the edges of the header and sorted by clicking it.
+	"""
+
+	name = WidgetName.DataGrid
+	tk_class = 'Canvas'
+
+	cell_padding = 4  # px, horizontal
+	row_spacing = 4  # px, added to the line space of the font
+	resize_margin = 4  # px around the column edges in the header
+
+	# constructor
+	def __init__(
+			self,
+			columns: List[Column] = None,
+			select_listener: Callable[[int | None], Any] = None,
+			scroll_listener: Callable[[float, float], Any] = None,
+			xscroll_listener: Callable[[float, float], Any] = None,
+			**kwargs
+	):
+		"""
+		:param columns: Their values are stored compactly (see `compact_column`).
+		:param select_listener: Called with the (data) row selected by the user.
+		:param scroll_listener: Called with the (first, last) vertical fractions of the view, e.g. a scrollbar's `set`.
+		:param xscroll_listener: Same for the horizontal ones.
+		"""
+
+		super().__init__(**kwargs)
+
+		self.select_listener = select_listener
+		self.scroll_listener = scroll_listener
+		self.xscroll_listener = xscroll_listener
+
+		self._columns: List[Column] = []
+		self._count = 0
+		self._col_x: List[int] = [0]  # left edge of each column (and the right edge of the last one)
+
+		self._order: Sequence[int] | None = None  # row at each position, None for the natural order
+		self._sort: Tuple[int, bool] | None = None  # (column, descending)
+		self._sort_orders: Dict[int, Sequence[int]] = {}  # ascending orders per column
+		self._selected: int | None = None
+
+		self._first = 0  # first position in view
+		self._x = 0  # horizontal scroll (px)
+		self._width = 0
+		self._height = 0
+
+		# drawing, set when styled
+		self._font: str | None = None
+		self._colors: Dict[str, str | None] = {}
+		self._row_h = 20
+		self._char_w = 8
+
+		# canvas items: rows in display order as (tag, background, cell texts), header as (background, text) per column
+		self._slots: Deque[Tuple[str, int, List[int]]] = deque()
+		self._header: List[Tuple[int, int]] = []
+		self._cols_in_view = (0, 0)
+
+		self._resizing: int | None = None
+		self._rebuild_later: RateLimiter | None = None
+
+		self.set_columns(columns if columns is not None else [])
+
+	def create_tk_widget(self, tk_parent: TkWidget):
+		self._tk_widget = tk.Canvas(tk_parent, takefocus=True)
+
+	def post_create(self):
+		c = self._tk_widget
+		tk_win = self.window.tk_win
+
+		self._width = int(c.cget('width'))
+		self._height = int(c.cget('height'))
+		self._rebuild_later = RateLimiter(tk_win, self._rebuild, EventRate.Latest)
+
+		c.bind('<Configure>', RateLimiter(tk_win, self._on_tk_resize, EventRate.Latest))
+		c.bind('<ButtonPress-1>', self._on_tk_press)
+		c.bind('<B1-Motion>', self._on_tk_drag)
+		c.bind('<ButtonRelease-1>', self._on_tk_release)
+		c.bind('<MouseWheel>', self._on_tk_wheel)
+		c.bind('<Shift-MouseWheel>', self._on_tk_shift_wheel)
+		c.bind('<Button-4>', lambda _: self.scroll_by(-3))
+		c.bind('<Button-5>', lambda _: self.scroll_by(3))
+		c.bind('<Up>', lambda _: self.scroll_by(-1))
+		c.bind('<Down>', lambda _: self.scroll_by(1))
+		c.bind('<Prior>', lambda _: self.scroll_by(-self.rows_in_view))
+		c.bind('<Next>', lambda _: self.scroll_by(self.rows_in_view))
+		c.bind('<Home>', lambda _: self.scroll_to(0))
+		c.bind('<End>', lambda _: self.scroll_to(self._count))
+
+	def style_tk_widget(self):
+		super().style_tk_widget()
+		self._apply_style()
+		self._rebuild()
+
+	def restyle(self, diff_cache: Dict = None):
+		super().restyle(diff_cache)
+
+		if not self._rendered:
+			return
+
+		colors = self._colors
+
+		# the canvas items are only recreated when the font changed, recolored when only the colors did
+		if self._apply_style():
+			self._rebuild()
+		elif self._colors != colors:
+			self._recolor()
+
+	def detach(self):
+		self._slots.clear()
+		self._header = []
+
+		if self._rebuild_later is not None:
+			self._rebuild_later.cancel()
+			self._rebuild_later = None
+
+		return super().detach()
+
+	# ---
+	@property
+	def columns(self) -> List[Column]:
+		return self._columns
+
+	@property
+	def count(self) -> int:
+		return self._count
+
+	@property
+	def first_row(self) -> int:
+		return self._first
+
+	@property
+	def rows_in_view(self) -> int:
+		return max(1, (self._height - self._row_h) // self._row_h)
+
+	@property
+	def selected_row(self) -> int | None:
+		"""The selected (data) row."""
+
+		return self._selected
+
+	def row_at(self, pos: int) -> int:
+		"""Returns the (data) row shown at a position of the view."""
+
+		return pos if self._order is None else int(self._order[pos])
+
+	def cell(self, pos: int, column: int) -> Any:
+		return self._columns[column].values[self.row_at(pos)]
+
+	# data
+	def set_columns(self, columns: List[Column]):
+		counts = {len(_.values) for _ in columns}
+
+		if len(counts) > 1:
+			raise Exception('All the columns of a DataGrid must have the same number of values.')
+
+		for column in columns:
+			if column.sort_key is not None and len(column.sort_key) != len(column.values):
+				raise Exception(f'The sort keys of the column \'{column.name}\' do not match its values.')
+
+			column.values = compact_column(column.values)
+
+			if column.sort_key is not None:
+				column.sort_key = compact_column(column.sort_key)
+
+		self._columns = columns
+		self._count = counts.pop() if counts else 0
+		self._col_x = list(itertools.accumulate((_.width for _ in columns), initial=0))
+
+		self._order = None
+		self._sort = None
+		self._sort_orders = {}
+		self._selected = None
+		self._first = 0
+
+		self._rebuild()
+
+	def set_column_width(self, column: int, width: int):
+		self._columns[column].width = width
+		self._col_x = list(itertools.accumulate((_.width for _ in self._columns), initial=0))
+
+		if self._rebuild_later is not None:
+			self._rebuild_later()
+
+	def sort_by(self, column: int | None, descending: bool = False):
+		"""Sorts the rows by a column (back to the natural order if None)."""
+
+		if column is None:
+			self._order = None
+			self._sort = None
+		else:
+			order = self._sort_orders.get(column)
+
+			if order is None:
+				col = self._columns[column]
+				order = self._sort_orders[column] = argsort(col.sort_key if col.sort_key is not None else col.values)
+
+			self._order = order[::-1] if descending else order
+			self._sort = (column, descending)
+
+		if self._slots:
+			self._fill(0, len(self._slots))
+			self._update_header()
+
+	def select_row(self, row: int | None):
+		"""Selects a (data) row, None clears the selection."""
+
+		self._selected = row
+
+		if self._slots:
+			self._fill(0, len(self._slots))
+
+	# scrolling
+	def scroll_to(self, pos: int):
+		"""Scrolls the view so that it starts at the given position."""
+
+		pos = max(0, min(pos, self._count - self.rows_in_view))
+		delta = pos - self._first
+
+		if delta == 0:
+			return
+
+		slots = self._slots
+		n_slots = len(slots)
+
+		self._first = pos
+
+		if not slots:
+			pass
+		elif abs(delta) >= n_slots:
+			self._fill(0, n_slots)
+		else:
+			# the rows still in view move, the ones scrolled out come around to the other end
+			c = self._tk_widget
+			row_h = self._row_h
+
+			c.move('row', 0, -delta * row_h)
+
+			if delta > 0:
+				for _ in range(delta):
+					slot = slots.popleft()
+					c.move(slot[0], 0, n_slots * row_h)
+					slots.append(slot)
+
+				self._fill(n_slots - delta, n_slots)
+			else:
+				for _ in range(-delta):
+					slot = slots.pop()
+					c.move(slot[0], 0, -n_slots * row_h)
+					slots.appendleft(slot)
+
+				self._fill(0, -delta)
+
+		self._notify_scroll()
+
+	def scroll_by(self, rows: int):
+		self.scroll_to(self._first + rows)
+
+	def scroll_x_to(self, x: int):
+		x = max(0, min(x, self._col_x[-1] - self._width))
+
+		if x == self._x:
+			return
+
+		dx = x - self._x
+		self._x = x
+
+		# not rendered yet, the view is built at the position
+		if self._tk_widget is None:
+			pass
+		elif self._columns_in_view() == self._cols_in_view:
+			self._tk_widget.move('grid', -dx, 0)
+		else:
+			self._rebuild()
+
+		self._notify_scroll()
+
+	def yview(self, *args) -> Tuple[float, float] | None:
+		"""Scrollbar protocol (see `tk.Listbox.yview`), in rows."""
+
+		n = max(self._count, 1)
+
+		if not args:
+			return self._first / n, min(1.0, (self._first + self.rows_in_view) / n)
+
+		if args[0] == 'moveto':
+			self.scroll_to(round(float(args[1]) * n))
+		elif args[0] == 'scroll':
+			step = self.rows_in_view if args[2] == 'pages' else 1
+			self.scroll_by(int(args[1]) * step)
+
+		return None
+
+	def xview(self, *args) -> Tuple[float, float] | None:
+		"""Scrollbar protocol (see `tk.Canvas.xview`), in pixels."""
+
+		total = max(self._col_x[-1], 1)
+
+		if not args:
+			return self._x / total, min(1.0, (self._x + self._width) / total)
+
+		if args[0] == 'moveto':
+			self.scroll_x_to(round(float(args[1]) * total))
+		elif args[0] == 'scroll':
+			step = self._width if args[2] == 'pages' else self._char_w * 4
+			self.scroll_x_to(self._x + int(args[1]) * step)
+
+		return None
+
+	def _notify_scroll(self):
+		if self.scroll_listener is not None:
+			self.scroll_listener(*self.yview())
+
+		if self.xscroll_listener is not None:
+			self.xscroll_listener(*self.xview())
+
+	# drawing
+	def resolved_style(self) -> ResolvedStyle:
+		if self.uses_theme_style:
+			return self.theme.compiled.resolved(self.name)
+
+		return self.theme.resolve(self.style)
+
+	def _apply_style(self) -> bool:
+		"""Takes the font and colors of the resolved style. Returns whether the font changed."""
+
+		style = self.resolved_style()
+		fonts = self.window.fonts
+
+		font = (
+			fonts.name(style.font),
+			fonts.metrics(style.font, 'linespace') + self.row_spacing,
+			max(1, fonts.measure(style.font, '0'))
+		)
+		font_changed = font != (self._font, self._row_h, self._char_w)
+
+		self._font, self._row_h, self._char_w = font
+
+		self._colors = {
+			'bg': style.background,
+			'fg': style.foreground,
+			'header-bg': style.background_active or style.background,
+			'header-fg': style.foreground_active or style.foreground,
+			'select-bg': style.background_select or style.background,
+			'select-fg': style.foreground_select or style.foreground
+		}
+
+		return font_changed
+
+	def _recolor(self):
+		c = self._tk_widget
+		colors = self._colors
+
+		for bg, text in self._header:
+			c.itemconfigure(bg, fill=colors['header-bg'], outline=colors['bg'])
+			c.itemconfigure(text, fill=colors['header-fg'])
+
+		self._fill(0, len(self._slots))
+
+	def _columns_in_view(self) -> Tuple[int, int]:
+		col_x = self._col_x
+		x = self._x
+
+		start = max(0, bisect.bisect_right(col_x, x) - 1)
+		end = min(len(self._columns), bisect.bisect_left(col_x, x + self._width))
+
+		return start, end
+
+	def _rebuild(self):
+		"""Recreates the canvas items, for the current size, columns and style."""
+
+		if self._tk_widget is None or self._font is None:
+			return
+
+		c = self._tk_widget
+		c.delete('grid')
+
+		self._slots.clear()
+		self._header = []
+
+		self._cols_in_view = start, end = self._columns_in_view()
+		self._first = max(0, min(self._first, self._count - self.rows_in_view))
+
+		col_x, x, row_h, pad = self._col_x, self._x, self._row_h, self.cell_padding
+		font, colors = self._font, self._colors
+		right = col_x[-1] - x
+
+		n_slots = max(0, -(-(self._height - row_h) // row_h))
+
+		for k in range(n_slots):
+			tag = f'row{k}'
+			y = row_h * (k + 1)
+
+			bg = c.create_rectangle(-x, y, right, y + row_h, width=0, tags=('grid', 'row', tag))
+			texts = [
+				c.create_text(col_x[i] - x + pad, y + row_h // 2, anchor='w', font=font, tags=('grid', 'row', tag))
+				for i in range(start, end)
+			]
+
+			self._slots.append((tag, bg, texts))
+
+		# drawn last, above the rows
+		for i in range(start, end):
+			x0 = col_x[i] - x
+
+			self._header.append((
+				c.create_rectangle(x0, 0, x0 + self._columns[i].width, row_h, fill=colors['header-bg'], outline=colors['bg'], tags=('grid', 'header')),
+				c.create_text(x0 + pad, row_h // 2, anchor='w', font=font, fill=colors['header-fg'], tags=('grid', 'header'))
+			))
+
+		self._fill(0, n_slots)
+		self._update_header()
+
+		self._notify_scroll()
+
+	def _max_chars(self, column: Column) -> int:
+		# canvas texts are not clipped, they are cut to (about) the column width
+		return max(0, (column.width - 2 * self.cell_padding) // self._char_w)
+
+	def _update_header(self):
+		c = self._tk_widget
+		start = self._cols_in_view[0]
+
+		for i, (_, text) in enumerate(self._header, start):
+			column = self._columns[i]
+			label = column.name
+
+			if self._sort is not None and self._sort[0] == i:
+				label += ' ▼' if self._sort[1] else ' ▲'
+
+			c.itemconfigure(text, text=label[:self._max_chars(column)])
+
+	def _fill(self, k0: int, k1: int):
+		"""Sets the texts and colors of the row slots from `k0` to `k1` (excluded)."""
+
+		# the hot path of scrolling, calling Tcl directly skips tkinter's option processing
+		call = self._tk_widget.tk.call
+		w = self._tk_widget._w
+
+		colors = self._colors
+		start, end = self._cols_in_view
+		columns = [(_.values, _.fmt, self._max_chars(_)) for _ in self._columns[start:end]]
+		count, order, selected = self._count, self._order, self._selected
+
+		for k in range(k0, k1):
+			_, bg, texts = self._slots[k]
+			pos = self._first + k
+
+			if pos >= count:
+				call(w, 'itemconfigure', bg, '-fill', '')
+
+				for text in texts:
+					call(w, 'itemconfigure', text, '-text', '')
+
+				continue
+
+			row = pos if order is None else int(order[pos])
+			is_selected = row == selected
+
+			call(w, 'itemconfigure', bg, '-fill', colors['select-bg' if is_selected else 'bg'] or '')
+			fg = colors['select-fg' if is_selected else 'fg'] or 'black'
+
+			for text, (values, fmt, max_chars) in zip(texts, columns):
+				call(w, 'itemconfigure', text, '-text', fmt(values[row])[:max_chars], '-fill', fg)
+
+	# events
+	def _on_tk_resize(self, event: tk.Event):
+		if (event.width, event.height) == (self._width, self._height):
+			return
+
+		self._width, self._height = event.width, event.height
+
+		self._rebuild()
+
+	def _column_edge(self, x: int) -> int | None:
+		# the column whose right edge is at x (content coordinates)
+		col_x = self._col_x
+		i = bisect.bisect_left(col_x, x - self.resize_margin)
+
+		if 0 < i < len(col_x) and abs(col_x[i] - x) <= self.resize_margin:
+			return i - 1
+
+		return None
+
+	def _on_tk_press(self, event: tk.Event):
+		self._tk_widget.focus_set()
+
+		x = event.x + self._x
+
+		if event.y < self._row_h:
+			self._resizing = self._column_edge(x)
+
+			if self._resizing is None:
+				column = bisect.bisect_right(self._col_x, x) - 1
+
+				if 0 <= column < len(self._columns):
+					descending = self._sort is not None and self._sort == (column, False)
+					self.sort_by(column, descending)
+
+			return
+
+		pos = self._first + (event.y - self._row_h) // self._row_h
+
+		if pos < self._count:
+			self.select_row(self.row_at(pos))
+
+			if self.select_listener is not None:
+				self.select_listener(self._selected)
+
+	def _on_tk_drag(self, event: tk.Event):
+		if self._resizing is None:
+			return
+
+		i = self._resizing
+		self.set_column_width(i, max(2 * self.cell_padding, event.x + self._x - self._col_x[i]))
+
+	def _on_tk_release(self, _):
+		self._resizing = None
+
+	def _on_tk_wheel(self, event: tk.Event):
+		# Windows reports multiples of 120, macOS small deltas
+		delta = event.delta // 40 if abs(event.delta) >= 120 else event.delta
+		self.scroll_by(-delta)
+
+	def _on_tk_shift_wheel(self, event: tk.Event):
+		delta = event.delta // 40 if abs(event.delta) >= 120 else event.delta
+		self.scroll_x_to(self._x - delta * self._char_w * 4)
@@ -1,13 +1,15 @@
 import random
+import time
 from ctypes import windll
 
 from base_types import Fill, SelectionMode
 from base_widget import PackProperties
 from canvas import Canvas
 from compound_widget import Scrollable, RadioButtonGroup
+from data_grid import DataGrid, Column
 from layout import Container, FlexLayout, FlexLayoutOptions
 from utils import gen_random_color
-from widget import Button, Entry, ComboBox, SpinBox, CheckBox, Slider, ListBox
+from widget import Button, Entry, ComboBox, SpinBox, CheckBox, Slider, ListBox, VirtualListBox, LogView
 from window import MainWindow
 
 # N_BTNS = 4
@@ -254,6 +256,81 @@ def list_box_demo():
 	win.show()
 
 
+def virtual_list_box_demo():
+	win = MainWindow('Virtual ListBox Demo', (500, 500))
+
+	list_box = VirtualListBox(
+		parent=win,
+		source=[f'{i:06d} {random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}' for i in range(500_000)],
+		selection_mode=SelectionMode.Multiple
+	)
+
+	def on_click():
+		list_box.select_all()
+		print(list_box.selected_count)
+
+	btn = Button(parent=win, text='Select All', click_listener=on_click)
+
+	win.add_widget(list_box, 'pack', PackProperties(expand=True, fill=Fill.Both))
+	win.add_widget(btn, 'pack', PackProperties(expand=False))
+
+	win.show()
+
+
+def large_combo_box_demo():
+	win = MainWindow('Large ComboBox Demo', (500, 500))
+
+	combo = ComboBox(
+		parent=win,
+		options=sorted({f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}' for _ in range(10_000)}),
+		page_size=50
+	)
+
+	win.add_widget(combo, 'pack', PackProperties(expand=False))
+
+	win.show()
+
+
+def data_grid_demo():
+	win = MainWindow('DataGrid Demo', (800, 500))
+
+	n = 1_000_000
+
+	grid = DataGrid(
+		parent=win,
+		columns=[
+			Column('Id', range(n), width=80),
+			Column('Name', [f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}' for _ in range(n)], width=200),
+			Column('Score', [random.random() * 100 for _ in range(n)], fmt='{:.2f}'.format)
+		]
+	)
+
+	win.add_widget(grid, 'pack', PackProperties(expand=True, fill=Fill.Both))
+
+	win.show()
+
+
+def log_view_demo():
+	win = MainWindow('LogView Demo', (800, 500))
+
+	def tail():
+		i = 0
+
+		while True:
+			i += 1
+
+			yield f'{i:08d} {random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} logged in'
+
+			if i % 1000 == 0:
+				time.sleep(0.02)
+
+	log_view = LogView(parent=win, capacity=5000, provider=tail)
+
+	win.add_widget(log_view, 'pack', PackProperties(expand=True, fill=Fill.Both))
+
+	win.show()
+
+
 rprx = (0, 1000)
 rpry = (0, 750)
 
@@ -0,0 +1,79 @@
+import hashlib
+import tkinter as tk
+from tkinter import font as tk_font
+from typing import Dict, Tuple
+
+from style import Font
+
+_MEASURE_CACHE_SIZE = 65536
+
+
+# ---
+def font_name(font: Font) -> str:
+	"""Returns the (stable) name of the named Tk font registered for a font value."""
+
+	return 'tkui-' + hashlib.md5(repr(font).encode()).hexdigest()[:12]
+
+
+class FontRegistry:
+	"""
+	Turns every distinct `Font` value into one named `tkinter.font.Font`, so Tk parses each font only once.
+
+	Text measurements and font metrics are cached as well.
+	"""
+
+	def __init__(self, tk_win: tk.Tk):
+		self._tk_win = tk_win
+
+		self._fonts: Dict[Font, tk_font.Font] = {}
+
+		self._measures: Dict[Tuple[Font, str], int] = {}
+		self._metrics: Dict[Font, Dict[str, int]] = {}
+
+	# ---
+	def get(self, font: Font) -> tk_font.Font:
+		_ = self._fonts.get(font)
+
+		if _ is None:
+			name = font_name(font)
+			exists = name in tk_font.names(self._tk_win)
+
+			if exists:
+				_ = tk_font.Font(root=self._tk_win, name=name, exists=True)
+			else:
+				_ = tk_font.Font(root=self._tk_win, name=name, font=font)
+
+			self._fonts[font] = _
+
+		return _
+
+	def name(self, font: Font) -> str:
+		return self.get(font).name
+
+	# ---
+	def measure(self, font: Font, text: str) -> int:
+		"""Returns the width of `text` in pixels."""
+
+		key = (font, text)
+		width = self._measures.get(key)
+
+		if width is None:
+			if len(self._measures) >= _MEASURE_CACHE_SIZE:
+				self._measures.clear()
+
+			width = self._measures[key] = self.get(font).measure(text)
+
+		return width
+
+	def metrics(self, font: Font, option: str = None) -> Dict[str, int] | int:
+		"""Returns the metrics of the font (ascent, descent, linespace, fixed), or one of them."""
+
+		metrics = self._metrics.get(font)
+
+		if metrics is None:
+			metrics = self._metrics[font] = self.get(font).metrics()
+
+		if option is not None:
+			return metrics[option]
+
+		return metrics
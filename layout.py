@@ -1,12 +1,14 @@
 import tkinter as tk
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Tuple, Literal, Any
+from typing import List, Tuple, Literal, Any, Dict, Iterable
 
 from base_types import TkWidget, Anchor, Side, Fill, CompoundWidgetName
 from compound_widget import CompoundWidget
 from object import Object
+from base_widget import BaseWidget
 from style import WidgetStyle, Theme
+from tracing import TRACER
 from widget import Widget
 
 
@@ -206,13 +208,41 @@ class Container(CompoundWidget):
 
 		self._children.append((widget, layout_ppts))
 
+	def iter_children(self) -> Iterable[BaseWidget]:
+		return (child for child, _ in self._children)
+
 	def create_tk_widget(self, tk_parent: TkWidget):
 		self._tk_widget = tk.Frame(tk_parent, background=self.theme.color_('.bg'))
 
-		self._layout.render_children(self._tk_widget, self._children, self.theme)
+		if not TRACER.enabled:
+			self._layout.render_children(self._tk_widget, self._children, self.theme)
+		else:
+			start = TRACER.begin()
+			self._layout.render_children(self._tk_widget, self._children, self.theme)
+			TRACER.end('layout', self, start)
 
 	def config_tk_widget(self, which_ones: List[str] = None):
 		pass
 
 	def style_tk_widget(self):
 		pass
+
+	def restyle(self, diff_cache: Dict = None):
+		super().restyle(diff_cache)
+
+		if not self._rendered:
+			return
+
+		bg = self.theme.color_('.bg')
+
+		if self._tk_widget['background'] == bg:
+			return
+
+		self.apply_tk_options({'background': bg})
+
+		# spacer frames of the layout
+		children = {str(child._tk_widget) for child, _ in self._children}
+
+		for tk_child in self._tk_widget.winfo_children():
+			if isinstance(tk_child, tk.Frame) and str(tk_child) not in children:
+				tk_child.configure(background=bg)
@@ -0,0 +1,183 @@
+from typing import Any, Callable, Dict, List
+
+from base_types import BindingMode
+from base_widget import BaseWidget
+from scheduler import IdleFlusher
+
+
+class Model:
+	"""
+	An observable record of named fields.
+
+	Fields are plain Python values, reading a model never touches Tcl. Writes only record which fields changed; the
+	listeners are notified once per changed field with its latest value, on the next idle flush of the window the model
+	is bound to (immediately while it is not bound to any window). `update` changes many fields as one batch.
+	"""
+
+	__slots__ = ('_fields', '_listeners', '_changed', '_flusher')
+
+	# constructor
+	def __init__(self, **fields):
+		object.__setattr__(self, '_fields', dict(fields))
+		object.__setattr__(self, '_listeners', {})
+		object.__setattr__(self, '_changed', {})
+		object.__setattr__(self, '_flusher', None)
+
+	# ---
+	def __getattr__(self, key: str):
+		if key in Model.__slots__:
+			raise AttributeError(key)
+
+		try:
+			return self._fields[key]
+		except KeyError:
+			raise AttributeError(f'{self.__class__.__name__} has no field \'{key}\'') from None
+
+	def __setattr__(self, key: str, value: Any):
+		self.set(key, value)
+
+	def __repr__(self) -> str:
+		return f'{self.__class__.__name__}({self._fields!r})'
+
+	# ---
+	def get(self, key: str) -> Any:
+		return self._fields[key]
+
+	def as_dict(self) -> Dict[str, Any]:
+		return dict(self._fields)
+
+	def set(self, key: str, value: Any):
+		self.update(**{key: value})
+
+	def update(self, **values):
+		"""Changes many fields at once, listeners are notified in a single batch."""
+
+		fields = self._fields
+
+		for key in values:
+			if key not in fields:
+				raise AttributeError(f'{self.__class__.__name__} has no field \'{key}\'')
+
+		changed = False
+
+		for key, value in values.items():
+			if fields[key] == value:
+				continue
+
+			fields[key] = value
+
+			if key in self._listeners:
+				self._changed[key] = None
+				changed = True
+
+		if not changed:
+			return
+
+		if self._flusher is None:
+			self.notify()
+		else:
+			self._flusher.defer(self, self.notify)
+
+	# ---
+	def attach(self, flusher: IdleFlusher):
+		"""Batches the notifications on the given (window's) flusher."""
+
+		if self._flusher is None:
+			object.__setattr__(self, '_flusher', flusher)
+
+	def subscribe(self, key: str, listener: Callable[[Any], None]) -> Callable[[], None]:
+		"""Calls `listener` with the new value of the field after it changed. Returns a function unsubscribing it."""
+
+		if key not in self._fields:
+			raise AttributeError(f'{self.__class__.__name__} has no field \'{key}\'')
+
+		self._listeners.setdefault(key, []).append(listener)
+
+		def unsubscribe():
+			listeners = self._listeners.get(key)
+
+			if listeners is not None and listener in listeners:
+				listeners.remove(listener)
+
+				if not listeners:
+					del self._listeners[key]
+
+		return unsubscribe
+
+	def notify(self):
+		"""Notifies the listeners of the changed fields now."""
+
+		while self._changed:
+			changed = self._changed
+			object.__setattr__(self, '_changed', {})
+
+			for key in changed:
+				for listener in list(self._listeners.get(key, ())):
+					listener(self._fields[key])
+
+
+class Binding:
+	"""
+	Binds a property of a widget to a field of a model.
+
+	Model changes are applied to the widget in the model's batch, so they end up in the same idle flush as any other
+	property change. Widget changes (e.g. typing into an `Entry`) are written back to the model when the mode allows it.
+	"""
+
+	# ---
+	@property
+	def model(self) -> Model:
+		return self._model
+
+	@property
+	def widget(self) -> BaseWidget:
+		return self._widget
+
+	# constructor
+	def __init__(self, model: Model, key: str, widget: BaseWidget, ppt: str = 'value', mode: BindingMode = BindingMode.TwoWay):
+		"""
+		:param key: Field of the model.
+		:param ppt: Property of the widget (e.g. 'value' or 'text').
+		"""
+
+		self._model = model
+		self._key = key
+		self._widget = widget
+		self._ppt = ppt
+		self._mode = mode
+
+		self._unbinds: List[Callable[[], None]] = []
+
+		model.attach(widget.window.flusher)
+
+		if mode != BindingMode.ToModel:
+			self._unbinds.append(model.subscribe(key, self._to_widget))
+			self._to_widget(model.get(key))
+
+		if mode != BindingMode.ToWidget:
+			self._unbinds.append(widget.watch(ppt, self._to_model))
+
+			if mode == BindingMode.ToModel:
+				self._to_model(getattr(widget, ppt))
+
+	# ---
+	def _to_widget(self, value: Any):
+		widget = self._widget
+
+		if isinstance(getattr(type(widget), self._ppt, None), property):
+			setattr(widget, self._ppt, value)
+		else:
+			widget.update(**{self._ppt: value})
+
+	def _to_model(self, value: Any):
+		self._model.set(self._key, value)
+
+	def unbind(self):
+		for unbind in self._unbinds:
+			unbind()
+
+		self._unbinds = []
+
+
+def bind(model: Model, key: str, widget: BaseWidget, ppt: str = 'value', mode: BindingMode = BindingMode.TwoWay) -> Binding:
+	return Binding(model, key, widget, ppt, mode)
@@ -20,6 +20,13 @@ class Object:
 
 		return self.parent.theme
 
+	@property
+	def window(self) -> 'Object':
+		if self.parent is None:
+			raise NotImplementedError('Root objects must implement their own \'window\' property.')
+
+		return self.parent.window
+
 	# ---
 	def __init__(self, parent: 'Object' = None):
 		self._id = str(uuid4())
@@ -0,0 +1,129 @@
+import tkinter as tk
+from typing import Dict, Any, Tuple
+
+from base_types import WidgetName
+from fonts import FontRegistry
+from style import Theme, SupportedStyles
+
+# option database names of the widget options
+_DB_NAMES = {
+	'background': 'background',
+	'activebackground': 'activeBackground',
+	'selectbackground': 'selectBackground',
+	'inactiveselectbackground': 'inactiveSelectBackground',
+	'disabledbackground': 'disabledBackground',
+	'readonlybackground': 'readonlyBackground',
+	'foreground': 'foreground',
+	'activeforeground': 'activeForeground',
+	'selectforeground': 'selectForeground',
+	'disabledforeground': 'disabledForeground',
+	'font': 'font',
+	'cursor': 'cursor',
+	'borderwidth': 'borderWidth',
+	'relief': 'relief',
+	'selectborderwidth': 'selectBorderWidth',
+	'highlightcolor': 'highlightColor',
+	'highlightthickness': 'highlightThickness',
+	'highlightbackground': 'highlightBackground'
+}
+
+
+# Tk classes also used by widgets the framework creates internally (e.g. the canvas of `Scrollable`), which must not
+# get the theme's style
+_INTERNAL_CLASSES = {'Canvas', 'Frame', 'Scrollbar'}
+
+
+class OptionDatabase:
+	"""
+	Installs the theme's style of each widget type into Tk's option database, keyed on the Tk widget class.
+
+	The defaults of a Tk class are added right before the first widget of that class is created, so every widget
+	created afterwards starts with the theme's style and only needs the options that differ from it.
+
+	Switching themes replaces only the entries installed here: Tk cannot remove single entries, so the options the new
+	theme no longer sets get the Tk defaults back. The other entries of the database (e.g. the application's) are kept.
+	"""
+
+	def __init__(self, tk_win: tk.Tk, fonts: FontRegistry):
+		self._tk_win = tk_win
+		self._fonts = fonts
+
+		self._theme: Theme | None = None
+		self._revision = None
+
+		self._defaults: Dict[str, Tuple[WidgetName, SupportedStyles, Dict[str, Any]]] = {}
+		self._tk_defaults: Dict[str, Dict[str, Any]] = {}
+
+	# ---
+	def _sync(self, theme: Theme):
+		if theme is self._theme and theme.revision == self._revision:
+			return
+
+		self._theme = theme
+		self._revision = theme.revision
+
+		installed = self._defaults
+		self._defaults = {}
+
+		for tk_class, (name, supported_styles, old_options) in installed.items():
+			options = theme.compiled.named_options(name, supported_styles, self._fonts.name)
+			dropped = old_options.keys() - options.keys()
+
+			if dropped:
+				tk_defaults = self.tk_defaults(tk_class)
+				self._install(tk_class, {key: tk_defaults[key] for key in dropped})
+
+			self._install(tk_class, {key: value for key, value in options.items() if old_options.get(key) != value})
+			self._defaults[tk_class] = (name, supported_styles, options)
+
+	def _install(self, tk_class: str, options: Dict[str, Any]):
+		for key, value in options.items():
+			self._tk_win.option_add(f'*{tk_class}.{_DB_NAMES[key]}', value)
+
+	def tk_defaults(self, tk_class: str) -> Dict[str, Any]:
+		"""Returns the built-in defaults of the options of a Tk class (read from a temporary widget once)."""
+
+		tk_defaults = self._tk_defaults.get(tk_class)
+
+		if tk_defaults is None:
+			tk_ = self._tk_win.tk
+			path = '._tkui_defaults'
+
+			tk_.call(tk_class.lower(), path)
+
+			try:
+				entries = map(tk_.splitlist, tk_.splitlist(tk_.call(path, 'configure')))
+
+				# aliases (e.g. -bg) have only 2 fields
+				tk_defaults = self._tk_defaults[tk_class] = {_[0][1:]: _[3] for _ in entries if len(_) == 5}
+			finally:
+				tk_.call('destroy', path)
+
+		return tk_defaults
+
+	def defaults(self, theme: Theme, name: WidgetName, tk_class: str, supported_styles: SupportedStyles) -> Dict[str, Any] | None:
+		"""
+		Returns the style options Tk applies to new widgets of `tk_class`, installing them if needed.
+
+		Returns None if the Tk class is already used by another widget type, or internally.
+		"""
+
+		if tk_class in _INTERNAL_CLASSES:
+			return None
+
+		self._sync(theme)
+
+		entry = self._defaults.get(tk_class)
+
+		if entry is None:
+			options = theme.compiled.named_options(name, supported_styles, self._fonts.name)
+
+			self._install(tk_class, options)
+			self._defaults[tk_class] = (name, supported_styles, options)
+
+			return options
+
+		if entry[0] != name or entry[1] != supported_styles:
+			return None
+
+		return entry[2]
@@ -0,0 +1,66 @@
+from typing import Any, Dict, Hashable, List, Tuple
+
+from base_types import TkWidget
+
+
+class WidgetPool:
+	"""
+	Detached Tk widgets of a window, kept for reuse by new widgets of the same kind.
+
+	Tk widgets cannot change their Tk parent, so they are pooled per (widget type, backend, Tk parent). Each entry also
+	keeps the style options the Tk widget is configured with, so that reusing it only applies the differences.
+	"""
+
+	def __init__(self, max_size: int = 32):
+		"""
+		:param max_size: Maximum number of pooled Tk widgets per key, the extra ones are destroyed.
+		"""
+
+		self.max_size = max_size
+
+		self._entries: Dict[Hashable, List[Tuple[TkWidget, Any]]] = {}
+
+	# ---
+	@staticmethod
+	def key(widget, tk_parent: TkWidget, *extra: Hashable) -> Hashable:
+		return widget.name, type(widget), str(tk_parent), *extra
+
+	def acquire(self, key: Hashable) -> Tuple[TkWidget, Any] | None:
+		"""Takes a pooled (Tk widget, style options) entry, None if there is none left."""
+
+		entries = self._entries.get(key)
+
+		while entries:
+			entry = entries.pop()
+
+			# gone with its Tk parent
+			if entry[0].winfo_exists():
+				return entry
+
+		return None
+
+	def release(self, key: Hashable, tk_widget: TkWidget, style_options: Any) -> bool:
+		"""Pools a detached Tk widget. Returns False (and leaves it alone) when the pool is full."""
+
+		entries = self._entries.setdefault(key, [])
+
+		if len(entries) >= self.max_size:
+			return False
+
+		entries.append((tk_widget, style_options))
+
+		return True
+
+	def clear(self):
+		"""Destroys all the pooled Tk widgets."""
+
+		entries = self._entries
+		self._entries = {}
+
+		for entries_ in entries.values():
+			for tk_widget, _ in entries_:
+				if tk_widget.winfo_exists():
+					tk_widget.destroy()
+
+	def __len__(self) -> int:
+		return sum(len(_) for _ in self._entries.values())
@@ -0,0 +1,191 @@
+import asyncio
+import inspect
+import queue
+import threading
+import time
+from typing import Any, AsyncIterable, Callable, Iterable, Iterator, List, Sequence
+
+from base_types import TkWindow
+
+# items (or a function returning them, called off the Tk thread), e.g. a generator reading a file
+ItemProvider = Iterable[Any] | AsyncIterable[Any] | Callable[[], Iterable[Any] | AsyncIterable[Any]]
+
+
+def paged(fetch: Callable[[int, int], Sequence[Any]], page_size: int = 500) -> Iterator[Any]:
+	"""
+	Turns a page fetching function (e.g. a `LIMIT ? OFFSET ?` query) into a provider.
+
+	:param fetch: Called with (offset, limit), returns the items of the page, less than `limit` on the last page.
+	"""
+
+	offset = 0
+
+	while True:
+		page = fetch(offset, page_size)
+
+		yield from page
+
+		if len(page) < page_size:
+			return
+
+		offset += len(page)
+
+
+class ProviderLoad:
+	"""
+	Loads the items of a provider on a worker thread and streams them to the Tk thread in pages.
+
+	Tk is only used from the Tk thread: the worker puts the pages into a queue which the Tk loop polls. A page is sent
+	when it is full or when `poll_interval` passed since the previous one, so slow providers still fill in steadily.
+	Async iterables run in their own event loop on the worker. Each load has its own daemon thread, so a provider that
+	never ends (e.g. following a log) does not keep the application alive; cancelling stops it at the next item.
+	"""
+
+	def __init__(
+			self,
+			tk_win: TkWindow,
+			provider: ItemProvider,
+			on_items: Callable[[List[Any]], Any],
+			on_done: Callable[[], Any] = None,
+			on_error: Callable[[BaseException], Any] = None,
+			page_size: int = 500,
+			poll_interval: int = 30
+	):
+		"""
+		:param on_items: Called on the Tk thread with each page of items.
+		:param on_done: Called on the Tk thread once all the items were passed to `on_items`.
+		:param on_error: Called on the Tk thread with the exception raised by the provider, it is raised in the Tk loop
+		if None.
+		:param poll_interval: Interval (ms) of polling for pages.
+		"""
+
+		self.on_items = on_items
+		self.on_done = on_done
+		self.on_error = on_error
+		self.page_size = page_size
+		self.poll_interval = poll_interval
+
+		self._tk_win = tk_win
+		self._provider = provider
+		self._queue = queue.SimpleQueue()
+		self._cancelled = threading.Event()
+		self._poll_after = None
+		self._loading = False
+		self._count = 0
+
+	# ---
+	@property
+	def loading(self) -> bool:
+		return self._loading
+
+	@property
+	def count(self) -> int:
+		"""Number of items received so far."""
+
+		return self._count
+
+	def start(self) -> 'ProviderLoad':
+		self._loading = True
+
+		threading.Thread(target=self._run, name='tkui-provider', daemon=True).start()
+
+		self._poll_after = self._tk_win.after(self.poll_interval, self._poll)
+
+		return self
+
+	def cancel(self):
+		"""Stops the load, no more callbacks are made."""
+
+		self._cancelled.set()
+		self._loading = False
+
+		if self._poll_after is not None:
+			self._tk_win.after_cancel(self._poll_after)
+			self._poll_after = None
+
+	# worker thread
+	def _run(self):
+		try:
+			items = self._provider() if callable(self._provider) else self._provider
+
+			if inspect.isasyncgen(items) or isinstance(items, AsyncIterable):
+				asyncio.run(self._consume_async(items))
+			else:
+				self._consume(items)
+		except BaseException as e:
+			self._queue.put(('error', e))
+		else:
+			self._queue.put(('done', None))
+
+	def _consume(self, items: Iterable[Any]):
+		page = []
+		sent = time.monotonic()
+
+		try:
+			for item in items:
+				if self._cancelled.is_set():
+					return
+
+				page.append(item)
+
+				if len(page) >= self.page_size or (time.monotonic() - sent) * 1000 >= self.poll_interval:
+					self._queue.put(('items', page))
+
+					page = []
+					sent = time.monotonic()
+		finally:
+			# including the items received before an error
+			if page:
+				self._queue.put(('items', page))
+
+	async def _consume_async(self, items: AsyncIterable[Any]):
+		page = []
+		sent = time.monotonic()
+
+		try:
+			async for item in items:
+				if self._cancelled.is_set():
+					return
+
+				page.append(item)
+
+				if len(page) >= self.page_size or (time.monotonic() - sent) * 1000 >= self.poll_interval:
+					self._queue.put(('items', page))
+
+					page = []
+					sent = time.monotonic()
+		finally:
+			# including the items received before an error
+			if page:
+				self._queue.put(('items', page))
+
+	# Tk thread
+	def _poll(self):
+		self._poll_after = None
+
+		while not self._cancelled.is_set():
+			try:
+				kind, value = self._queue.get_nowait()
+			except queue.Empty:
+				break
+
+			if kind == 'items':
+				self._count += len(value)
+				self.on_items(value)
+
+				continue
+
+			self._loading = False
+
+			if kind == 'done':
+				if self.on_done is not None:
+					self.on_done()
+			elif self.on_error is not None:
+				self.on_error(value)
+			else:
+				raise value
+
+			return
+
+		if not self._cancelled.is_set():
+			self._poll_after = self._tk_win.after(self.poll_interval, self._poll)
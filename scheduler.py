@@ -0,0 +1,126 @@
+import time
+from typing import Any, Callable, Dict
+
+from base_types import TkWindow, EventRate
+
+
+class IdleFlusher:
+	"""
+	Coalesces deferred work of a window into a single `after_idle` callback.
+
+	Work is keyed, deferring the same key again before the flush is a no-op, so e.g. a widget changed many times in one
+	event-loop turn is reconfigured once.
+	"""
+
+	def __init__(self, tk_win: TkWindow):
+		self._tk_win = tk_win
+
+		self._pending: Dict[Any, Callable[[], None]] = {}
+		self._scheduled = None
+
+	# ---
+	def defer(self, key: Any, callback: Callable[[], None]):
+		"""Runs `callback` on the next flush, once per key."""
+
+		if key in self._pending:
+			return
+
+		self._pending[key] = callback
+
+		if self._scheduled is None:
+			self._scheduled = self._tk_win.after_idle(self._on_idle)
+
+	def cancel(self, key: Any):
+		self._pending.pop(key, None)
+
+	def _on_idle(self):
+		self._scheduled = None
+
+		self.flush()
+
+	def flush(self):
+		"""Runs all the deferred work now (including work deferred while flushing)."""
+
+		if self._scheduled is not None:
+			self._tk_win.after_cancel(self._scheduled)
+			self._scheduled = None
+
+		while self._pending:
+			pending = self._pending
+			self._pending = {}
+
+			for callback in pending.values():
+				callback()
+
+
+class RateLimiter:
+	"""
+	Limits how often a callback is called, scheduling the delayed calls on the Tk loop (see `EventRate`).
+
+	Used in place of the callback; delayed calls get the arguments of the latest call.
+	"""
+
+	def __init__(self, tk_win: TkWindow, callback: Callable[..., Any], rate: EventRate, interval: int = 50):
+		"""
+		:param interval: Throttling/debouncing interval (ms), unused for `EventRate.Latest`.
+		"""
+
+		self.callback = callback
+		self.rate = rate
+		self.interval = interval
+
+		self._tk_win = tk_win
+		self._args = None
+		self._scheduled = None
+		self._last_call = 0.0
+
+	# ---
+	def __call__(self, *args):
+		self._args = args
+
+		if self.rate == EventRate.Latest:
+			if self._scheduled is None:
+				self._scheduled = self._tk_win.after_idle(self._call)
+
+		elif self.rate == EventRate.Debounce:
+			if self._scheduled is not None:
+				self._tk_win.after_cancel(self._scheduled)
+
+			self._scheduled = self._tk_win.after(self.interval, self._call)
+
+		elif self._scheduled is None:
+			remaining = self.interval - (time.monotonic() - self._last_call) * 1000
+
+			if remaining <= 0:
+				self._call()
+			else:
+				self._scheduled = self._tk_win.after(int(remaining) + 1, self._call)
+
+	def _call(self):
+		self._scheduled = None
+		self._last_call = time.monotonic()
+
+		args = self._args
+		self._args = None
+
+		self.callback(*args)
+
+	@property
+	def pending(self) -> bool:
+		return self._scheduled is not None
+
+	def flush(self):
+		"""Makes the pending call now."""
+
+		if self._scheduled is not None:
+			self._tk_win.after_cancel(self._scheduled)
+			self._call()
+
+	def cancel(self):
+		"""Drops the pending call."""
+
+		if self._scheduled is not None:
+			self._tk_win.after_cancel(self._scheduled)
+			self._scheduled = None
+
+		self._args = None
@@ -0,0 +1,403 @@
+import time
+import re
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from base_types import FilterMode
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+def _fold(item) -> str:
+	return str(item).casefold().replace('\n', ' ')
+
+
+def _fuzzy_pattern(query: str) -> re.Pattern:
+	return re.compile('[^\n]*?'.join(map(re.escape, query)))
+
+
+def _predicate(query: str, mode: FilterMode) -> Callable[[str], Any]:
+	if mode == FilterMode.Prefix:
+		return lambda _: _.startswith(query)
+
+	if mode == FilterMode.Substring:
+		return lambda _: query in _
+
+	return _fuzzy_pattern(query).search
+
+
+def id_opcodes(old_ids: Sequence[int], new_ids: Sequence[int]) -> List[Tuple[str, int, int, int, int]]:
+	"""
+	Returns the (non-equal) `difflib` style opcodes turning one ascending id list into another, e.g. the items shown
+	before and after changing a filter.
+	"""
+
+	n_old, n_new = len(old_ids), len(new_ids)
+	opcodes = []
+
+	i = j = 0
+
+	while True:
+		while i < n_old and j < n_new and old_ids[i] == new_ids[j]:
+			i += 1
+			j += 1
+
+		if i >= n_old and j >= n_new:
+			return opcodes
+
+		i0, j0 = i, j
+
+		while i < n_old or j < n_new:
+			if i < n_old and j < n_new:
+				old_id, new_id = old_ids[i], new_ids[j]
+
+				if old_id == new_id:
+					break
+
+				if old_id < new_id:
+					i += 1
+				else:
+					j += 1
+
+			elif i < n_old:
+				i = n_old
+			else:
+				j = n_new
+
+		tag = 'replace' if i > i0 and j > j0 else 'delete' if i > i0 else 'insert'
+		opcodes.append((tag, i0, i, j0, j))
+
+
+class FilteredItems(Sequence):
+	"""The items at the given ids of a list (e.g. a filter's result), without copying them."""
+
+	def __init__(self, items: Sequence[str], ids: Sequence[int]):
+		self.items = items
+		self.ids = ids
+
+	def __len__(self) -> int:
+		return len(self.ids)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self.items[_] for _ in self.ids[i]]
+
+		return self.items[self.ids[i]]
+
+
+def _runs(values) -> Iterator[Tuple[int, int, int]]:
+	"""Yields the (value, start, end) of each run of equal values in a sorted array."""
+
+	if not len(values):
+		return
+
+	bounds = (np.flatnonzero(values[1:] != values[:-1]) + 1).tolist()
+
+	yield from zip(values[[0, *bounds]].tolist(), [0, *bounds], [*bounds, len(values)])
+
+
+class _Segment:
+	"""
+	A run of consecutive items of an `ItemIndex`, indexed on its own.
+
+	With NumPy, the case-folded items are joined (one per line) into an array of character codes. For each character,
+	the segment keeps the items containing it with its first and last position in each, and for each pair of adjacent
+	characters (bigram) its positions. Queries are then a few array operations over the entries of the query's
+	characters or rarest bigram. Without it, the folded items are scanned.
+	"""
+
+	def __init__(self, items: List[str]):
+		self.items = items
+		self.built = False
+
+		self._folded: List[str] | None = None
+
+		self._codes = None
+		self._starts = None  # first code of each item
+		self._ends = None  # newline after each item
+		self._chars: Dict[str, Tuple[Any, Any, Any]] = {}  # (items, first positions, last positions)
+		self._bigrams: Dict[str, Any] = {}  # positions
+
+	def __len__(self) -> int:
+		return len(self.items)
+
+	def changed(self):
+		self.built = False
+		self._folded = None
+		self._codes = self._starts = self._ends = None
+		self._chars = {}
+		self._bigrams = {}
+
+	def build(self):
+		folded = [_fold(item) for item in self.items]
+		self.built = True
+
+		if np is None:
+			self._folded = folded
+			return
+
+		text = ''.join(f'{_}\n' for _ in folded)
+
+		if text.isascii():
+			codes = np.frombuffer(text.encode('ascii'), np.uint8)
+		else:
+			codes = np.frombuffer(text.encode('utf-32-le'), np.uint32)
+
+		lengths = np.fromiter(map(len, folded), np.int64, len(folded)) + 1
+		ends = np.cumsum(lengths) - 1
+
+		self._codes = codes
+		self._starts = ends - lengths + 1
+		self._ends = ends
+
+		line_of = np.repeat(np.arange(len(folded), dtype=np.int32), lengths)
+
+		# positions grouped by character (stable sorts keep them ascending)
+		order = np.argsort(codes, kind='stable').astype(np.int32)
+
+		for code, start, end in _runs(codes[order]):
+			if code == 10:
+				continue
+
+			positions = order[start:end]
+			lines = line_of[positions]
+			first = np.concatenate(((True,), lines[1:] != lines[:-1]))
+			last = np.concatenate((first[1:], (True,)))
+
+			self._chars[chr(code)] = (lines[first], positions[first], positions[last])
+
+		wide, shift = (np.uint64, 32) if codes.dtype == np.uint32 else (np.uint16, 8)
+
+		# the pairs across two items are left out
+		kept = np.flatnonzero((codes[:-1] != 10) & (codes[1:] != 10)).astype(np.int32)
+		pairs = (codes[kept].astype(wide) << wide(shift)) | codes[kept + 1]
+
+		order = np.argsort(pairs, kind='stable')
+		positions = kept[order]
+
+		for pair, start, end in _runs(pairs[order]):
+			self._bigrams[chr(pair >> shift) + chr(pair & ((1 << shift) - 1))] = positions[start:end]
+
+	def search(self, query: str, mode: FilterMode) -> Sequence[int]:
+		"""Returns the (ascending) indices in the segment of the items matching the (folded, non empty) query."""
+
+		if np is None:
+			match = _predicate(query, mode)
+
+			return [i for i, _ in enumerate(self._folded) if match(_)]
+
+		chars = self._chars
+
+		# every match contains all the characters of the query
+		if any(_ not in chars for _ in query):
+			return ()
+
+		codes = self._codes
+
+		if mode == FilterMode.Prefix:
+			lines = np.flatnonzero(codes[self._starts] == ord(query[0]))
+
+			# an item shorter than the query fails on its newline
+			for i, char in enumerate(query[1:], 1):
+				lines = lines[codes[self._starts[lines] + i] == ord(char)]
+
+			return lines
+
+		if len(query) == 1:
+			return chars[query][0]
+
+		if mode == FilterMode.Fuzzy:
+			# greedy: the first occurrence of the first character, then the next occurrence of each following one
+			lines, found, _ = chars[query[0]]
+			n = len(self.items)
+
+			for i, char in enumerate(query[1:], 2):
+				char_lines, char_first, char_last = chars[char]
+
+				last = np.full(n, -1, np.int32)
+				last[char_lines] = char_last
+
+				kept = found < last[lines]
+				lines, found = lines[kept], found[kept]
+
+				if i == len(query):
+					break
+
+				first = np.zeros(n, np.int32)
+				first[char_lines] = char_first
+
+				# the next occurrence is the first one if it is after the previous match, otherwise it is found by
+				# stepping through the codes (it exists, the last occurrence is after the previous match)
+				found = np.maximum(first[lines], found + 1)
+				code = ord(char)
+				stepping = np.flatnonzero(codes[found] != code)
+
+				while len(stepping):
+					found[stepping] += 1
+					stepping = stepping[codes[found[stepping]] != code]
+
+			return lines
+
+		bigrams = self._bigrams
+		offsets = [i for i in range(len(query) - 1) if query[i:i + 2] in bigrams]
+
+		if len(offsets) < len(query) - 1:
+			return ()
+
+		# the matches start at the positions of the rarest bigram of the query, moved back by its offset; the other
+		# characters are checked outwards from it, so a candidate fails on a newline before leaving the codes
+		offset = min(offsets, key=lambda _: len(bigrams[query[_:_ + 2]]))
+		found = bigrams[query[offset:offset + 2]].astype(np.int64)
+
+		for i in range(offset + 2, len(query)):
+			found = found[codes[found + (i - offset)] == ord(query[i])]
+
+		for i in range(offset - 1, -1, -1):
+			found = found[codes[found - (offset - i)] == ord(query[i])]
+
+		lines = np.searchsorted(self._ends, found)
+
+		if len(lines) > 1:
+			lines = lines[np.concatenate(((True,), lines[1:] != lines[:-1]))]
+
+		return lines
+
+
+class ItemIndex:
+	"""
+	Case-insensitive search index over the items of a list.
+
+	The items are indexed in segments of `segment_size` items, so an edit only rebuilds the segments it touches and the
+	index can be built a segment at a time (see `build`, e.g. in event-loop time slices). Pending segments are built
+	by the next query.
+
+	With NumPy (optional), a query only looks at the index entries of its characters or rarest bigram (see `_Segment`),
+	instead of every item. Without it, queries scan the case-folded items.
+	"""
+
+	segment_size = 16384
+
+	def __init__(self, items: Sequence[str] = ()):
+		self._segments: List[_Segment] = []
+
+		self.set_items(items)
+
+	def __len__(self) -> int:
+		return sum(map(len, self._segments))
+
+	@property
+	def pending(self) -> bool:
+		"""Whether segments are left to build."""
+
+		return not all(_.built for _ in self._segments)
+
+	def build(self, time_slice: float = None) -> bool:
+		"""
+		Builds the pending segments, for at most `time_slice` ms if given (at least one segment).
+
+		Returns whether segments are left to build.
+		"""
+
+		deadline = time.perf_counter() + time_slice / 1000 if time_slice is not None else None
+
+		for segment in self._segments:
+			if segment.built:
+				continue
+
+			if deadline is not None and time.perf_counter() >= deadline:
+				return True
+
+			segment.build()
+
+		return False
+
+	# ---
+	def set_items(self, items: Sequence[str]):
+		size = self.segment_size
+
+		self._segments = [_Segment(list(items[i:i + size])) for i in range(0, len(items), size)]
+
+	def append(self, items: Sequence[str]):
+		segments = self._segments
+		size = self.segment_size
+
+		segments.extend(_Segment(list(items[i:i + size])) for i in range(0, len(items), size))
+
+		# small appends are merged as they accumulate (like a binary counter), each item is rebuilt O(log) times
+		while len(segments) > 1 and len(segments[-2]) <= len(segments[-1]) and len(segments[-2]) < size:
+			last = segments.pop()
+			segments[-1].items.extend(last.items)
+			segments[-1].changed()
+
+	def insert(self, i: int, items: Sequence[str]):
+		segments = self._segments
+
+		if not segments:
+			self.append(items)
+			return
+
+		k, i = self._locate(min(i, len(self)))
+		segment = segments[k]
+
+		segment.items[i:i] = items
+		segment.changed()
+
+		if len(segment) > 2 * self.segment_size:
+			size = self.segment_size
+			segments[k:k + 1] = [_Segment(segment.items[j:j + size]) for j in range(0, len(segment), size)]
+
+	def delete(self, start: int, end: int):
+		"""Deletes the items in `[start, end)`."""
+
+		end = min(end, len(self))
+		base = 0
+
+		for segment in self._segments:
+			n = len(segment)
+
+			if base < end and start < base + n:
+				del segment.items[max(start - base, 0):end - base]
+				segment.changed()
+
+			base += n
+
+		self._segments = [_ for _ in self._segments if len(_)]
+
+	def _locate(self, i: int) -> Tuple[int, int]:
+		"""Returns the (segment, index in it) of the item at `i` (or of the end)."""
+
+		for k, segment in enumerate(self._segments):
+			if i < len(segment) or k == len(self._segments) - 1:
+				return k, i
+
+			i -= len(segment)
+
+		return 0, 0
+
+	# ---
+	def search(self, query: str, mode: FilterMode = FilterMode.Substring) -> List[int]:
+		"""Returns the (ascending) indices of the items matching the query."""
+
+		query = _fold(query)
+
+		if not query:
+			return list(range(len(self)))
+
+		self.build()
+
+		ids = []
+		base = 0
+
+		for segment in self._segments:
+			found = segment.search(query, mode)
+
+			if len(found):
+				ids.append(found + base if np is not None else [_ + base for _ in found])
+
+			base += len(segment)
+
+		if np is not None:
+			return np.concatenate(ids).tolist() if ids else []
+
+		return [_ for found in ids for _ in found]
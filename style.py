@@ -1,12 +1,11 @@
-from copy import deepcopy
-from dataclasses import dataclass, fields, field
+from dataclasses import dataclass, fields, field, replace
 from enum import Enum
-from types import UnionType
-from typing import Tuple, Optional, Dict, Any
+from types import MappingProxyType
+from typing import Tuple, Optional, Dict, Any, Callable
 import tkinter as tk
 
 from base_types import WidgetName, BaseWidgetName, CompoundWidgetName
-from utils import rgb_to_hex
+from utils import rgb_to_hex, TrackedDict, type_validator
 
 # TODO
 # - insert styles
@@ -150,7 +149,7 @@ class BorderType(Enum):
 
 
 # ---
-@dataclass
+@dataclass(frozen=True)
 class Border:
 	width: int
 	type: BorderType = BorderType.Flat
@@ -160,17 +159,17 @@ class Border:
 
 	def __post_init__(self):
 		if self.active_type is None:
-			self.active_type = self.type
+			object.__setattr__(self, 'active_type', self.type)
 
 		if self.select_width is None:
-			self.select_width = self.width
+			object.__setattr__(self, 'select_width', self.width)
 
 	@staticmethod
 	def default():
 		return Border(2, BorderType.Solid)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Highlight:
 	color: Color
 	width: int
@@ -182,7 +181,7 @@ class Highlight:
 
 
 # ---
-@dataclass
+@dataclass(frozen=True)
 class SupportedStyles:
 	bg: bool
 	fg: bool
@@ -220,31 +219,58 @@ class BaseWidgetStyle:
 	foreground_disabled: Color | None = None
 
 	def update(self, **kwargs):
-		valid_fields = {f.name: f.type for f in fields(self)}
+		return self.apply(self.check(**kwargs))
+
+	def apply(self, changes: Dict[str, Any]):
+		"""Applies already validated changes (see `check`)."""
+
+		for key, value in changes.items():
+			setattr(self, key, value)
+
+		return self
+
+	@classmethod
+	def check(cls, **kwargs) -> Dict[str, Any]:
+		"""Validates style updates without applying them."""
+
+		return style_schema(cls).check(**kwargs)
 
-		for key, value in kwargs.items():
-			if key in valid_fields:
-				valid_type = valid_fields[key]
 
-				type_not_valid = False
+class StyleSchema:
+	"""The fields of a style class and their validators, computed once per class (see `style_schema`)."""
 
-				if isinstance(valid_type, UnionType) and type(value) not in valid_type.__args__:
-					type_not_valid = True
-				else:
-					if not isinstance(value, valid_type):
-						type_not_valid = True
+	def __init__(self, style_class: type):
+		self.types: Dict[str, Any] = {f.name: f.type for f in fields(style_class)}
+		self.validators: Dict[str, Callable[[Any], bool]] = {name: type_validator(type_) for name, type_ in self.types.items()}
 
-				if type_not_valid:
-					raise TypeError(f'\'{key}\' must be of type {valid_type}.')
+	def check(self, **kwargs) -> Dict[str, Any]:
+		validators = self.validators
 
-				setattr(self, key, value)
+		for key, value in kwargs.items():
+			validator = validators.get(key)
 
-			else:
+			if validator is None:
 				raise AttributeError(f'WidgetStyle has no attribute \'{key}\'')
 
-		return self
+			if not validator(value):
+				raise TypeError(f'\'{key}\' must be of type {self.types[key]}.')
+
+		return kwargs
+
+
+_STYLE_SCHEMAS: Dict[type, StyleSchema] = {}
 
 
+def style_schema(style_class: type) -> StyleSchema:
+	schema = _STYLE_SCHEMAS.get(style_class)
+
+	if schema is None:
+		schema = _STYLE_SCHEMAS[style_class] = StyleSchema(style_class)
+
+	return schema
+
+
+# ---
 @dataclass
 class WidgetStyle(BaseWidgetStyle):
 	pass
@@ -255,7 +281,225 @@ class CompoundWidgetStyle(BaseWidgetStyle):
 	additional_styles: Dict[str, Any] = field(default_factory=lambda: {})
 
 
+@dataclass(frozen=True)
+class ResolvedStyle:
+	"""A style with every theme reference (colors, margins, enums) resolved into final Tk values."""
+
+	background: str | None
+	background_active: str | None
+	background_select: str | None
+	background_inactive_select: str | None
+	background_disabled: str | None
+	background_read_only: str | None
+
+	foreground: str | None
+	foreground_active: str | None
+	foreground_select: str | None
+	foreground_disabled: str | None
+
+	font: Font
+	cursor: str
+
+	border_width: int | None
+	relief: str | None
+	select_border_width: int | None
+
+	highlight_color: str | None
+	highlight_width: int | None
+	highlight_background: str | None
+
+	margin: Tuple[int, int]
+	padding: Tuple[int, int]
+
+	def tk_options(self, supported_styles: SupportedStyles) -> Dict[str, Any]:
+		"""Returns the Tk options of the style that a widget supporting `supported_styles` accepts."""
+
+		options = {}
+
+		active_styles_supported = supported_styles.active_styles
+		select_styles_supported = supported_styles.select_styles
+		inactive_select_styles_supported = supported_styles.inactive_select_styles
+		disabled_styles_supported = supported_styles.disabled_styles
+		read_only_styles_supported = supported_styles.read_only_styles
+
+		# background
+		if supported_styles.bg:
+			if self.background is not None:
+				options['background'] = self.background
+
+			if active_styles_supported:
+				if self.background_active is not None:
+					options['activebackground'] = self.background_active
+
+			if select_styles_supported:
+				if self.background_select is not None:
+					options['selectbackground'] = self.background_select
+
+			if inactive_select_styles_supported:
+				if self.background_inactive_select is not None:
+					options['inactiveselectbackground'] = self.background_inactive_select
+
+			if disabled_styles_supported:
+				if self.background_disabled is not None:
+					options['disabledbackground'] = self.background_disabled
+
+			if read_only_styles_supported:
+				if self.background_read_only is not None:
+					options['readonlybackground'] = self.background_read_only
+
+		# foreground
+		if supported_styles.fg:
+			if self.foreground is not None:
+				options['foreground'] = self.foreground
+
+			if active_styles_supported:
+				if self.foreground_active is not None:
+					options['activeforeground'] = self.foreground_active
+
+			if select_styles_supported:
+				if self.foreground_select is not None:
+					options['selectforeground'] = self.foreground_select
+
+			if disabled_styles_supported:
+				if self.foreground_disabled is not None:
+					options['disabledforeground'] = self.foreground_disabled
+
+		# font
+		if supported_styles.font:
+			if self.font is not None:
+				options['font'] = self.font
+
+		# cursor
+		options['cursor'] = self.cursor
+
+		# border
+		if supported_styles.border:
+			if self.border_width is not None:
+				options['borderwidth'] = self.border_width
+				options['relief'] = self.relief
+
+				if active_styles_supported:
+					# options['activerelief'] = border.active_type.value
+					pass
+
+				if select_styles_supported:
+					options['selectborderwidth'] = self.select_border_width
+
+		# highlight
+		if supported_styles.highlight:
+			if self.highlight_width is not None:
+				if self.highlight_color is not None:
+					options['highlightcolor'] = self.highlight_color
+
+				options['highlightthickness'] = self.highlight_width
+
+				if self.highlight_background is not None:
+					options['highlightbackground'] = self.highlight_background
+
+		return options
+
+
+# ---
+class StyleOverlay:
+	"""
+	Copy-on-write view of a shared (theme) style.
+
+	Reads fall through to the shared base style until the widget calls `update`, which stores the changed fields in
+	a small overlay. The base style itself is never modified: its nested values are immutable (`Border`, `Highlight`)
+	or read through a read-only view (`additional_styles`), changing them goes through `update` too.
+	"""
+
+	__slots__ = ('_base', '_overrides')
+
+	# ---
+	@property
+	def base(self) -> BaseWidgetStyle:
+		return self._base
+
+	@property
+	def overridden(self) -> bool:
+		return self._overrides is not None
+
+	# constructor
+	def __init__(self, base: BaseWidgetStyle):
+		object.__setattr__(self, '_base', base)
+		object.__setattr__(self, '_overrides', None)
+
+	# ---
+	def __getattr__(self, key: str):
+		if key in StyleOverlay.__slots__:
+			raise AttributeError(key)
+
+		overrides = self._overrides
+
+		if overrides is not None and key in overrides:
+			return overrides[key]
+
+		value = getattr(self._base, key)
+
+		if isinstance(value, dict):
+			return MappingProxyType(value)
+
+		return value
+
+	def __setattr__(self, key: str, value: Any):
+		self.update(**{key: value})
+
+	def __reduce__(self):
+		return _restore_overlay, (self._base, self._overrides)
+
+	def __repr__(self) -> str:
+		return f'{self.__class__.__name__}({self._base!r}, overrides={self._overrides!r})'
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, StyleOverlay):
+			return self.materialize() == other.materialize()
+
+		return self.materialize() == other
+
+	# ---
+	def update(self, **kwargs):
+		return self.apply(self._base.check(**kwargs))
+
+	def apply(self, changes: Dict[str, Any]):
+		"""Applies already validated changes (see `BaseWidgetStyle.check`)."""
+
+		if self._overrides is None:
+			object.__setattr__(self, '_overrides', {})
+
+		self._overrides.update(changes)
+
+		return self
+
+	def rebase(self, base: BaseWidgetStyle):
+		"""Points the overlay at another shared style (e.g. after a theme switch), keeping the overrides."""
+
+		object.__setattr__(self, '_base', base)
+
+	def materialize(self) -> BaseWidgetStyle:
+		"""Returns a standalone style with the overrides applied."""
+
+		if self._overrides is None:
+			return replace(self._base)
+
+		return replace(self._base, **self._overrides)
+
+
+def _restore_overlay(base: BaseWidgetStyle, overrides: Dict[str, Any] | None) -> StyleOverlay:
+	overlay = StyleOverlay(base)
+	object.__setattr__(overlay, '_overrides', None if overrides is None else dict(overrides))
+
+	return overlay
+
+
 # ---
+_DEFAULT_WIDGET_STYLE = WidgetStyle()
+_DEFAULT_COMPOUND_WIDGET_STYLE = CompoundWidgetStyle()
+
+
+_TRACKED_THEME_FIELDS = ('margin', 'color', 'widget', 'compound_widget')
+
+
 @dataclass
 class Theme:
 	margin: Dict[str, int]
@@ -263,14 +507,89 @@ class Theme:
 	widget: Dict[WidgetName, WidgetStyle]
 	compound_widget: Dict[CompoundWidgetName, CompoundWidgetStyle]
 
-	def get(self, name: BaseWidgetName) -> BaseWidgetStyle:
+	def __setattr__(self, key: str, value: Any):
+		if key in _TRACKED_THEME_FIELDS:
+			value = TrackedDict(value)
+			value.on_change = self.invalidate
+
+		super().__setattr__(key, value)
+
+		if key in _TRACKED_THEME_FIELDS:
+			self.invalidate()
+
+	# ---
+	@property
+	def revision(self) -> int:
+		"""Incremented whenever the theme changes."""
+
+		return self.__dict__.get('_revision', 0)
+
+	@property
+	def compiled(self) -> 'CompiledTheme':
+		compiled = self.__dict__.get('_compiled')
+
+		if compiled is None:
+			compiled = CompiledTheme(self)
+			object.__setattr__(self, '_compiled', compiled)
+
+		return compiled
+
+	def invalidate(self):
+		"""
+		Marks the compiled form of the theme as stale.
+
+		Changes to `margin`, `color`, `widget` and `compound_widget` are tracked automatically, this is only needed
+		after modifying one of the theme's styles in place.
+		"""
+
+		object.__setattr__(self, '_revision', self.revision + 1)
+
+	# ---
+	def base(self, name: BaseWidgetName) -> BaseWidgetStyle:
+		"""Returns the shared style of a widget. It must not be modified."""
+
 		if isinstance(name, WidgetName):
-			return deepcopy(self.widget.get(name, WidgetStyle()))
+			return self.widget.get(name, _DEFAULT_WIDGET_STYLE)
 		elif isinstance(name, CompoundWidgetName):
-			return deepcopy(self.compound_widget.get(name, CompoundWidgetStyle()))
+			return self.compound_widget.get(name, _DEFAULT_COMPOUND_WIDGET_STYLE)
 		else:
 			raise TypeError()
 
+	def get(self, name: BaseWidgetName) -> StyleOverlay:
+		return StyleOverlay(self.base(name))
+
+	def resolve(self, style: BaseWidgetStyle | StyleOverlay) -> ResolvedStyle:
+		border = style.border
+		highlight = style.highlight
+
+		return ResolvedStyle(
+			background=self.color_(style.background),
+			background_active=self.color_(style.background_active),
+			background_select=self.color_(style.background_select),
+			background_inactive_select=self.color_(style.background_inactive_select),
+			background_disabled=self.color_(style.background_disabled),
+			background_read_only=self.color_(style.background_read_only),
+
+			foreground=self.color_(style.foreground),
+			foreground_active=self.color_(style.foreground_active),
+			foreground_select=self.color_(style.foreground_select),
+			foreground_disabled=self.color_(style.foreground_disabled),
+
+			font=style.font,
+			cursor=style.cursor.value,
+
+			border_width=border.width if border is not None else None,
+			relief=border.type.value if border is not None else None,
+			select_border_width=border.select_width if border is not None else None,
+
+			highlight_color=self.color_(highlight.color) if highlight is not None else None,
+			highlight_width=highlight.width if highlight is not None else None,
+			highlight_background=self.color_(highlight.background) if highlight is not None else None,
+
+			margin=self.margin_(style.margin),
+			padding=self.margin_(style.padding)
+		)
+
 	def margin__(self, margin: str | int | None) -> int:
 		if margin is None:
 			return 0
@@ -306,11 +625,117 @@ class Theme:
 		color_ = str(color_)
 
 		if color_.startswith('.'):
-			return self.color.get(color_.removeprefix('.'), '#f0f')
+			named = self.color.get(color_.removeprefix('.'), '#f0f')
+
+			return rgb_to_hex(named) if isinstance(named, Tuple) else named
 
 		return color_
 
 
+class CompiledTheme:
+	"""
+	Resolved form of a `Theme`.
+
+	Every style of the theme is resolved once, Tk options are cached per (widget name, supported styles). The table
+	is rebuilt when the theme changes (see `Theme.revision`).
+	"""
+
+	def __init__(self, theme: Theme):
+		self._theme = theme
+		self._revision = None
+
+		self._resolved: Dict[BaseWidgetName, ResolvedStyle] = {}
+		self._options: Dict[Tuple[BaseWidgetName, SupportedStyles], Dict[str, Any]] = {}
+		self._named_options: Dict[Tuple[BaseWidgetName, SupportedStyles], Dict[str, Any]] = {}
+
+	def _sync(self):
+		theme = self._theme
+
+		if self._revision == theme.revision:
+			return
+
+		self._resolved = {name: theme.resolve(style) for name, style in theme.widget.items()}
+		self._resolved.update({name: theme.resolve(style) for name, style in theme.compound_widget.items()})
+		self._options = {}
+		self._named_options = {}
+
+		self._revision = theme.revision
+
+	# ---
+	@property
+	def resolved_styles(self) -> Dict[BaseWidgetName, ResolvedStyle]:
+		self._sync()
+
+		return dict(self._resolved)
+
+	def seed(self, resolved_styles: Dict[BaseWidgetName, ResolvedStyle]):
+		"""Uses already resolved styles (e.g. from a cache) for the current revision of the theme."""
+
+		self._resolved = dict(resolved_styles)
+		self._options = {}
+		self._named_options = {}
+
+		self._revision = self._theme.revision
+
+	def resolved(self, name: BaseWidgetName) -> ResolvedStyle:
+		self._sync()
+
+		resolved = self._resolved.get(name)
+
+		if resolved is None:
+			resolved = self._resolved[name] = self._theme.resolve(self._theme.base(name))
+
+		return resolved
+
+	def options(self, name: BaseWidgetName, supported_styles: SupportedStyles) -> Dict[str, Any]:
+		"""Returns the (shared) Tk options of a widget using the theme's style. It must not be modified."""
+
+		self._sync()
+
+		key = (name, supported_styles)
+		options = self._options.get(key)
+
+		if options is None:
+			options = self._options[key] = self.resolved(name).tk_options(supported_styles)
+
+		return options
+
+	def named_options(
+			self,
+			name: BaseWidgetName,
+			supported_styles: SupportedStyles,
+			font_name: Callable[[Font], str]
+	) -> Dict[str, Any]:
+		"""
+		Returns the `options` of a widget with the font replaced by its named font (see `FontRegistry.name`), the same
+		dict every time until the theme changes.
+		"""
+
+		options = self.options(name, supported_styles)
+		font = options.get('font')
+
+		if font is None:
+			return options
+
+		# the font names are stable, but each call registers the font in the caller's Tk interpreter
+		font = font_name(font)
+
+		key = (name, supported_styles)
+		named = self._named_options.get(key)
+
+		if named is None:
+			named = self._named_options[key] = dict(options, font=font)
+
+		return named
+
+	def spacing(self, name: BaseWidgetName) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+		"""Returns the resolved (margin, padding) of a widget using the theme's style."""
+
+		resolved = self.resolved(name)
+
+		return resolved.margin, resolved.padding
+
+
 THEME = Theme(
 	{
 		'xsm': 2,
@@ -431,6 +856,27 @@ THEME = Theme(
 			padding=(0, 0),
 			background='.bg',
 			border=Border(width=1, type=BorderType.Solid)
+		),
+		WidgetName.DataGrid: WidgetStyle(
+			margin=('n', 'n'),
+			padding=(0, 0),
+			background='.bg',
+			foreground='.on-bg',
+			background_active='.primary-bg',
+			foreground_active='.on-primary-bg',
+			background_select='.primary',
+			foreground_select='.on-primary',
+			border=Border(width=1, type=BorderType.Solid)
+		),
+		WidgetName.LogView: WidgetStyle(
+			margin=('n', 'n'),
+			padding=(0, 0),
+			background='.bg',
+			foreground='.on-bg',
+			background_select='.primary-bg',
+			foreground_select='.on-primary-bg',
+			font=('Consolas', 10),
+			border=Border(width=1, type=BorderType.Solid)
 		)
 	},
 	{}
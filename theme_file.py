@@ -0,0 +1,227 @@
+import dataclasses
+import json
+import os
+import tomllib
+import types
+import typing
+from enum import Enum
+from typing import Any, Dict
+
+from base_types import WidgetName, CompoundWidgetName, BaseWidgetName
+from style import Theme, WidgetStyle, CompoundWidgetStyle, BaseWidgetStyle, Color, ResolvedStyle
+from utils import type_validator
+
+# TODO
+# - saving themes
+
+CACHE_SUFFIX = '.tkui-cache'
+CACHE_VERSION = 2
+
+
+# ---
+def _convert(value: Any, type_) -> Any:
+	"""Converts a parsed (JSON/TOML) value into a value of the given type annotation."""
+
+	if value is None:
+		return None
+
+	origin = typing.get_origin(type_)
+	args = typing.get_args(type_)
+
+	if origin is typing.Union or origin is types.UnionType:
+		for arg in args:
+			if arg is type(None):
+				continue
+
+			try:
+				converted = _convert(value, arg)
+			except (TypeError, ValueError, KeyError):
+				continue
+
+			if type_validator(arg)(converted):
+				return converted
+
+		raise TypeError(f'{value!r} is not a valid {type_}.')
+
+	if origin is tuple:
+		if not isinstance(value, (list, tuple)) or len(value) != len(args):
+			raise TypeError(f'{value!r} is not a valid {type_}.')
+
+		return tuple(_convert(item, arg) for item, arg in zip(value, args))
+
+	if isinstance(type_, type) and issubclass(type_, Enum):
+		if isinstance(value, str) and value in type_.__members__:
+			return type_[value]
+
+		return type_(value)
+
+	if dataclasses.is_dataclass(type_):
+		if not isinstance(value, dict):
+			raise TypeError(f'{value!r} is not a valid {type_.__name__}.')
+
+		return _convert_dataclass(value, type_)
+
+	return value
+
+
+def _convert_dataclass(data: Dict[str, Any], class_):
+	field_types = {f.name: f.type for f in dataclasses.fields(class_)}
+
+	for key in data:
+		if key not in field_types:
+			raise AttributeError(f'{class_.__name__} has no attribute \'{key}\'')
+
+	return class_(**{key: _convert(value, field_types[key]) for key, value in data.items()})
+
+
+def _style(data: Dict[str, Any], style_class: type) -> BaseWidgetStyle:
+	style = _convert_dataclass(data, style_class)
+
+	style_class.check(**{f.name: getattr(style, f.name) for f in dataclasses.fields(style_class)})
+
+	return style
+
+
+def _name(key: str, name_class: type) -> BaseWidgetName:
+	if key in name_class.__members__:
+		return name_class[key]
+
+	return name_class(key)
+
+
+def parse_theme(data: Dict[str, Any]) -> Theme:
+	"""
+	Builds a theme from parsed theme file data:
+
+	- `margin` - named margins
+	- `color` - named colors
+	- `widget` - widget styles, keyed by `WidgetName` (value or name)
+	- `compound_widget` - compound widget styles, keyed by `CompoundWidgetName` (value or name)
+
+	Enums (cursors, border types) are given by value or name, tuples as lists.
+	"""
+
+	return Theme(
+		dict(data.get('margin', {})),
+		{key: _convert(value, Color) for key, value in data.get('color', {}).items()},
+		{_name(key, WidgetName): _style(value, WidgetStyle) for key, value in data.get('widget', {}).items()},
+		{_name(key, CompoundWidgetName): _style(value, CompoundWidgetStyle) for key, value in data.get('compound_widget', {}).items()}
+	)
+
+
+def read_theme_file(path: str) -> Theme:
+	if path.endswith('.toml'):
+		with open(path, 'rb') as f:
+			data = tomllib.load(f)
+	elif path.endswith('.json'):
+		with open(path, 'r', encoding='utf-8') as f:
+			data = json.load(f)
+	else:
+		raise ValueError(f'\'{path}\' is not a theme file (.json or .toml).')
+
+	return parse_theme(data)
+
+
+# ---
+def _cache_key(path: str) -> tuple:
+	stat = os.stat(path)
+
+	return CACHE_VERSION, stat.st_mtime_ns, stat.st_size
+
+
+def _data(value: Any) -> Any:
+	"""Turns a theme value into JSON data, which `_convert` turns back into the value."""
+
+	if dataclasses.is_dataclass(value):
+		return {f.name: _data(getattr(value, f.name)) for f in dataclasses.fields(value)}
+
+	if isinstance(value, Enum):
+		return value.name
+
+	if isinstance(value, (list, tuple)):
+		return [_data(_) for _ in value]
+
+	if isinstance(value, dict):
+		return {key.name if isinstance(key, Enum) else key: _data(_) for key, _ in value.items()}
+
+	return value
+
+
+def _read_cache(cache_path: str, key: tuple) -> Theme | None:
+	# plain data, a cache file cannot run code when loaded
+	try:
+		with open(cache_path, 'r', encoding='utf-8') as f:
+			cached = json.load(f)
+	except (OSError, ValueError):
+		return None
+
+	if not isinstance(cached, dict) or cached.get('key') != list(key):
+		return None
+
+	try:
+		theme = parse_theme(cached)
+		theme.compiled.seed({
+			_name(name, name_class): _convert_dataclass(resolved, ResolvedStyle)
+			for name_class, key_ in ((WidgetName, 'resolved_widget'), (CompoundWidgetName, 'resolved_compound_widget'))
+			for name, resolved in cached[key_].items()
+		})
+	except (TypeError, ValueError, KeyError, AttributeError):
+		return None
+
+	return theme
+
+
+def _write_cache(cache_path: str, key: tuple, theme: Theme):
+	resolved_styles = theme.compiled.resolved_styles
+
+	cached = _data({
+		'key': key,
+		'margin': dict(theme.margin),
+		'color': dict(theme.color),
+		'widget': dict(theme.widget),
+		'compound_widget': dict(theme.compound_widget),
+		'resolved_widget': {
+			name: resolved for name, resolved in resolved_styles.items() if isinstance(name, WidgetName)
+		},
+		'resolved_compound_widget': {
+			name: resolved for name, resolved in resolved_styles.items() if isinstance(name, CompoundWidgetName)
+		}
+	})
+
+	tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+
+	try:
+		with open(tmp_path, 'w', encoding='utf-8') as f:
+			json.dump(cached, f, separators=(',', ':'))
+
+		os.replace(tmp_path, cache_path)
+	except OSError:
+		# a read-only theme directory only costs the cache
+		try:
+			os.remove(tmp_path)
+		except OSError:
+			pass
+
+
+def load_theme(path: str, use_cache: bool = True) -> Theme:
+	"""
+	Loads a theme file (JSON or TOML).
+
+	The resolved theme is cached next to the file (`<path>.tkui-cache`, JSON data). As long as the file is unchanged,
+	loading it again is a single read of the cache, with no color/margin resolution.
+	"""
+
+	if not use_cache:
+		return read_theme_file(path)
+
+	key = _cache_key(path)
+	cache_path = path + CACHE_SUFFIX
+
+	theme = _read_cache(cache_path, key)
+
+	if theme is None:
+		theme = read_theme_file(path)
+
+		_write_cache(cache_path, key, theme)
+
+	return theme
@@ -0,0 +1,104 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+
+@dataclass(frozen=True)
+class Span:
+	phase: str  # construct, render, create, config, style, restyle, flush, layout
+	widget: str  # class name
+	widget_id: str
+	start: float  # time.perf_counter()
+	duration: float  # s
+
+
+class Tracer:
+	"""
+	Instrumentation hooks of the widget life cycle.
+
+	Disabled by default. Hot paths only read `enabled` (a plain attribute) before doing anything else, so a disabled
+	tracer costs one attribute lookup per hook. When enabled, every phase increments its counter and emits a `Span` to
+	the sinks (see `log_sink` for routing them to `logging`).
+
+	Usage in hot paths:
+
+	>>> tracing = TRACER.enabled
+	>>> if tracing:
+	>>> 	start = TRACER.begin()
+	>>> ...
+	>>> if tracing:
+	>>> 	TRACER.end('style', widget, start)
+	"""
+
+	def __init__(self):
+		self.enabled = False
+		self.counters: Dict[str, int] = {}
+
+		self._sinks: List[Callable[[Span], None]] = []
+
+	# ---
+	def enable(self, sink: Callable[[Span], None] = None):
+		if sink is not None:
+			self.add_sink(sink)
+
+		self.enabled = True
+
+	def disable(self):
+		self.enabled = False
+
+	def add_sink(self, sink: Callable[[Span], None]) -> Callable[[], None]:
+		"""Adds a span consumer. Returns a function removing it."""
+
+		self._sinks.append(sink)
+
+		def remove():
+			if sink in self._sinks:
+				self._sinks.remove(sink)
+
+		return remove
+
+	def reset(self) -> Dict[str, int]:
+		"""Clears the counters and returns their previous values."""
+
+		counters = self.counters
+		self.counters = {}
+
+		return counters
+
+	# ---
+	def count(self, name: str, n: int = 1):
+		self.counters[name] = self.counters.get(name, 0) + n
+
+	@staticmethod
+	def begin() -> float:
+		return time.perf_counter()
+
+	def end(self, phase: str, widget, start: float):
+		end = time.perf_counter()
+
+		self.count(phase)
+
+		if not self._sinks:
+			return
+
+		span = Span(phase, type(widget).__name__, getattr(widget, 'id', ''), start, end - start)
+
+		for sink in self._sinks:
+			sink(span)
+
+
+TRACER = Tracer()
+
+
+def log_sink(logger: logging.Logger = None, level: int = logging.DEBUG) -> Callable[[Span], None]:
+	"""Returns a sink writing the spans to a logger."""
+
+	if logger is None:
+		logger = logging.getLogger('tkui')
+
+	def sink(span: Span):
+		if logger.isEnabledFor(level):
+			logger.log(level, '%s %s (%s) %.3f ms', span.phase, span.widget, span.widget_id, span.duration * 1000)
+
+	return sink
@@ -0,0 +1,202 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Any, Tuple, List
+
+from base_types import WidgetName
+from fonts import FontRegistry
+from style import Theme, ResolvedStyle, SupportedStyles
+
+# ttk widgets taking the font as a widget option instead of a style option
+_WIDGET_FONT_CLASSES = {'TEntry', 'TSpinbox', 'TCombobox'}
+
+# ttk widgets drawing their content on a field
+_FIELD_CLASSES = {'TEntry', 'TSpinbox', 'TCombobox'}
+
+
+# ---
+def ttk_style_options(resolved: ResolvedStyle, supported_styles: SupportedStyles, ttk_class: str) -> Tuple[Dict[str, Any], Dict[str, List[Tuple[str, str]]]]:
+	"""Translates a resolved style into the options and state maps of a ttk style."""
+
+	options = {}
+	maps = {}
+
+	background_key = 'fieldbackground' if ttk_class in _FIELD_CLASSES else 'background'
+
+	# background
+	if supported_styles.bg:
+		if resolved.background is not None:
+			options[background_key] = resolved.background
+
+			if background_key != 'background':
+				options['background'] = resolved.background
+
+		states = []
+
+		if supported_styles.disabled_styles and resolved.background_disabled is not None:
+			states.append(('disabled', resolved.background_disabled))
+
+		if supported_styles.read_only_styles and resolved.background_read_only is not None:
+			states.append(('readonly', resolved.background_read_only))
+
+		if supported_styles.active_styles and resolved.background_active is not None:
+			states.append(('active', resolved.background_active))
+
+		if states:
+			maps[background_key] = states
+
+		if supported_styles.select_styles and resolved.background_select is not None:
+			options['selectbackground'] = resolved.background_select
+
+	# foreground
+	if supported_styles.fg:
+		if resolved.foreground is not None:
+			options['foreground'] = resolved.foreground
+
+		states = []
+
+		if supported_styles.disabled_styles and resolved.foreground_disabled is not None:
+			states.append(('disabled', resolved.foreground_disabled))
+
+		if supported_styles.active_styles and resolved.foreground_active is not None:
+			states.append(('active', resolved.foreground_active))
+
+		if states:
+			maps['foreground'] = states
+
+		if supported_styles.select_styles and resolved.foreground_select is not None:
+			options['selectforeground'] = resolved.foreground_select
+
+	# font
+	if supported_styles.font and resolved.font is not None and ttk_class not in _WIDGET_FONT_CLASSES:
+		options['font'] = resolved.font
+
+	# border
+	if supported_styles.border and resolved.border_width is not None:
+		options['borderwidth'] = resolved.border_width
+		options['relief'] = resolved.relief
+
+	return options, maps
+
+
+class TtkStyler:
+	"""
+	Maps the widget styles of a theme onto named ttk styles.
+
+	Every (widget name, ttk class) pair gets one named style (e.g. `button.TButton`), configured the first time a widget
+	of that kind is rendered. Widgets only reference the style by name, so switching themes reconfigures each named
+	style once instead of every widget. Widgets with an overridden style get a style of their own, released when they
+	are unrendered and reused by the next one.
+	"""
+
+	def __init__(self, tk_win: tk.Tk, fonts: FontRegistry, ttk_theme: str = None):
+		""":param ttk_theme: Switched to if given, e.g. 'clam' (the native themes ignore most colors)."""
+
+		self._style = ttk.Style(tk_win)
+		self._fonts = fonts
+
+		if ttk_theme is not None:
+			self._style.theme_use(ttk_theme)
+
+		self._theme: Theme | None = None
+		self._revision = None
+
+		self._styles: Dict[Tuple[WidgetName, str, SupportedStyles], Dict[str, Any]] = {}
+		self._configured: Dict[str, Tuple[Dict[str, Any], Dict[str, List[Tuple[str, str]]]]] = {}  # per style name
+
+		# styles of their own: per widget id, and the released ones per named style
+		self._custom: Dict[str, str] = {}
+		self._free: Dict[str, List[str]] = {}
+		self._custom_count = 0
+
+	# ---
+	@staticmethod
+	def style_name(name: WidgetName, ttk_class: str) -> str:
+		return f'{name.value}.{ttk_class}'
+
+	def configure(self, style_name: str, resolved: ResolvedStyle, supported_styles: SupportedStyles, ttk_class: str):
+		options, maps = ttk_style_options(resolved, supported_styles, ttk_class)
+
+		if 'font' in options:
+			options['font'] = self._fonts.name(options['font'])
+
+		old_options, old_maps = self._configured.get(style_name, ({}, {}))
+		self._configured[style_name] = (options, maps)
+
+		# the options and maps not set anymore (e.g. dropped by a new theme) go back to the ttk theme's
+		reset_options = {key: self._style.lookup(ttk_class, key) for key in old_options if key not in options}
+		reset_maps = {key: [] for key in old_maps if key not in maps}
+
+		if options or reset_options:
+			self._style.configure(style_name, **reset_options, **options)
+
+		if maps or reset_maps:
+			self._style.map(style_name, **reset_maps, **maps)
+
+	# ---
+	def _sync(self, theme: Theme):
+		if theme is self._theme and theme.revision == self._revision:
+			return
+
+		self._theme = theme
+		self._revision = theme.revision
+
+		keys = list(self._styles)
+		self._styles = {}
+
+		for key in keys:
+			self.options(theme, *key)
+
+	def options(self, theme: Theme, name: WidgetName, ttk_class: str, supported_styles: SupportedStyles) -> Dict[str, Any]:
+		"""Returns the (shared) widget options referencing the named ttk style of a widget using the theme's style."""
+
+		self._sync(theme)
+
+		key = (name, ttk_class, supported_styles)
+		options = self._styles.get(key)
+
+		if options is None:
+			resolved = theme.compiled.resolved(name)
+			style_name = self.style_name(name, ttk_class)
+
+			self.configure(style_name, resolved, supported_styles, ttk_class)
+
+			options = self._styles[key] = self.widget_options(style_name, resolved, supported_styles, ttk_class)
+
+		return options
+
+	def custom_options(self, widget_id: str, resolved: ResolvedStyle, name: WidgetName, ttk_class: str, supported_styles: SupportedStyles) -> Dict[str, Any]:
+		"""Configures a style of its own for a widget with an overridden style and returns its widget options."""
+
+		style_name = self._custom.get(widget_id)
+
+		if style_name is None:
+			named_style = self.style_name(name, ttk_class)
+			free = self._free.get(named_style)
+
+			if free:
+				style_name = free.pop()
+			else:
+				self._custom_count += 1
+				style_name = f'custom{self._custom_count}.{named_style}'
+
+			self._custom[widget_id] = style_name
+
+		self.configure(style_name, resolved, supported_styles, ttk_class)
+
+		return self.widget_options(style_name, resolved, supported_styles, ttk_class)
+
+	def release(self, widget_id: str):
+		"""Releases the style of a widget's own (see `custom_options`) for reuse, ttk styles cannot be deleted."""
+
+		style_name = self._custom.pop(widget_id, None)
+
+		if style_name is not None:
+			self._free.setdefault(style_name.split('.', 1)[1], []).append(style_name)
+
+	def widget_options(self, style_name: str, resolved: ResolvedStyle, supported_styles: SupportedStyles, ttk_class: str) -> Dict[str, Any]:
+		options = {'style': style_name, 'cursor': resolved.cursor}
+
+		if supported_styles.font and resolved.font is not None and ttk_class in _WIDGET_FONT_CLASSES:
+			options['font'] = self._fonts.name(resolved.font)
+
+		return options
@@ -1,13 +1,30 @@
+import bisect
+import builtins
+import collections.abc
+import itertools
 import random
-from typing import Tuple, List, Any
+import re
+import types
+import typing
+from functools import lru_cache
+from typing import Tuple, List, Any, Callable, ForwardRef, Sequence, Iterator
 import colorsys
+import difflib
 
 from base_types import Point
 
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 RGB = Tuple[int, int, int]
 HSL = Tuple[float, float, float]
 
+_COLOR_CACHE_SIZE = 4096
+
 
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
 def rgb_to_hex(rgb: RGB) -> str:
 	return '#%02x%02x%02x' % rgb
 
@@ -27,20 +44,22 @@ def gen_random_color() -> RGB:
 
 
 def gen_gradient(start: RGB, end: RGB, count: int) -> List[RGB]:
+	"""Returns `count` colors going from `start` to `end` (both included)."""
+
 	assert count > 1
 
-	delta_r = (end[0] - start[0]) / count
-	delta_g = (end[1] - start[1]) / count
-	delta_b = (end[2] - start[2]) / count
+	delta_r = (end[0] - start[0]) / (count - 1)
+	delta_g = (end[1] - start[1]) / (count - 1)
+	delta_b = (end[2] - start[2]) / (count - 1)
 
 	gradient = []
 
 	for i in range(count):
 		gradient.append(
 			(
-				start[0] + int(delta_r * i),
-				start[1] + int(delta_g * i),
-				start[2] + int(delta_b * i)
+				start[0] + round(delta_r * i),
+				start[1] + round(delta_g * i),
+				start[2] + round(delta_b * i)
 			)
 		)
 
@@ -48,6 +67,11 @@ def gen_gradient(start: RGB, end: RGB, count: int) -> List[RGB]:
 
 
 def adjust_brightness(rgb: RGB, factor: float):
+	return _adjust_brightness(tuple(rgb), factor)
+
+
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
+def _adjust_brightness(rgb: RGB, factor: float) -> RGB:
 	hls = list(rgb_to_hsl(rgb))
 
 	hls[1] = max(min(hls[1] * (1 + factor), 1.0), 0.0)
@@ -70,6 +94,174 @@ def is_dark(color: RGB) -> bool:
 	return luminance < 128
 
 
+# --- batched color utilities (NumPy-backed when available)
+def _hex_strings(flat_bytes: bytes) -> List[str]:
+	hex_ = flat_bytes.hex()
+
+	return ['#' + hex_[i:i + 6] for i in range(0, len(hex_), 6)]
+
+
+def _rgb_array(colors: Sequence[RGB], dtype) -> 'np.ndarray':
+	# (N, 3), the alpha of RGBA colors is dropped like in the single-color functions
+	if isinstance(colors, np.ndarray):
+		return np.ascontiguousarray(colors[:, :3], dtype=dtype)
+
+	return np.array([color[:3] for color in colors], dtype=dtype).reshape(-1, 3)
+
+
+def rgb_to_hex_many(colors: Sequence[RGB]) -> List[str]:
+	"""Converts many RGB (or RGBA) colors (a sequence or an (N, 3) / (N, 4) array) to hex strings."""
+
+	if np is not None and isinstance(colors, np.ndarray):
+		return _hex_strings(_rgb_array(colors, np.uint8).tobytes())
+
+	return _hex_strings(bytes(itertools.chain.from_iterable(color[:3] for color in colors)))
+
+
+def gen_gradient_hex(start: RGB, end: RGB, count: int) -> List[str]:
+	"""Same as `gen_gradient` but returns hex strings."""
+
+	assert count > 1
+
+	if np is None:
+		return rgb_to_hex_many(gen_gradient(start, end, count))
+
+	steps = np.arange(count, dtype=np.float64)[:, None] / (count - 1)
+	start_ = np.asarray(start[:3], dtype=np.float64)
+	end_ = np.asarray(end[:3], dtype=np.float64)
+
+	return rgb_to_hex_many(np.rint(start_ + (end_ - start_) * steps).astype(np.uint8))
+
+
+def _rgb_to_hls_array(rgb):
+	# vectorized colorsys.rgb_to_hls
+	r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+	max_c = rgb.max(axis=1)
+	min_c = rgb.min(axis=1)
+	sum_c = max_c + min_c
+	range_c = max_c - min_c
+
+	l = sum_c / 2.0
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		s = np.where(l <= 0.5, range_c / sum_c, range_c / (2.0 - max_c - min_c))
+
+		rc = (max_c - r) / range_c
+		gc = (max_c - g) / range_c
+		bc = (max_c - b) / range_c
+
+	h = np.where(r == max_c, bc - gc, np.where(g == max_c, 2.0 + rc - bc, 4.0 + gc - rc))
+	h = (h / 6.0) % 1.0
+
+	grey = range_c == 0
+
+	return np.where(grey, 0.0, h), l, np.where(grey, 0.0, s)
+
+
+def _hls_channel_array(m1, m2, hue):
+	hue = hue % 1.0
+
+	return np.select(
+		[hue < 1 / 6, hue < 0.5, hue < 2 / 3],
+		[m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2 / 3 - hue) * 6.0],
+		m1
+	)
+
+
+def _hls_to_rgb_array(h, l, s):
+	# vectorized colorsys.hls_to_rgb
+	m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+	m1 = 2.0 * l - m2
+
+	rgb = np.stack([
+		_hls_channel_array(m1, m2, h + 1 / 3),
+		_hls_channel_array(m1, m2, h),
+		_hls_channel_array(m1, m2, h - 1 / 3)
+	], axis=1)
+
+	return np.where((s == 0)[:, None], l[:, None], rgb)
+
+
+def adjust_brightness_many(colors: Sequence[RGB], factor: float) -> List[str]:
+	"""Same as `adjust_brightness` for many colors, returns hex strings."""
+
+	if np is None:
+		return rgb_to_hex_many([adjust_brightness(color, factor) for color in colors])
+
+	rgb = _rgb_array(colors, np.float64) / 255.0
+
+	h, l, s = _rgb_to_hls_array(rgb)
+	l = np.clip(l * (1 + factor), 0.0, 1.0)
+
+	return rgb_to_hex_many((_hls_to_rgb_array(h, l, s) * 255).astype(np.uint8))
+
+
+def darken_many(colors: Sequence[RGB], factor: float = 0.1) -> List[str]:
+	return adjust_brightness_many(colors, -factor)
+
+
+def lighten_many(colors: Sequence[RGB], factor: float = 0.1) -> List[str]:
+	return adjust_brightness_many(colors, factor)
+
+
+def is_dark_many(colors: Sequence[RGB]) -> List[bool]:
+	if np is None:
+		return [is_dark(color) for color in colors]
+
+	rgb = _rgb_array(colors, np.float64)
+
+	return (rgb @ np.array([0.2126, 0.7152, 0.0722]) < 128).tolist()
+
+
+def type_validator(tp) -> Callable[[Any], bool]:
+	"""Generates a function checking values against a type annotation (unions, tuples, forward references, ...)."""
+
+	if tp is Any:
+		return lambda _: True
+
+	if tp is None or tp is type(None):
+		return lambda _: _ is None
+
+	if isinstance(tp, str):
+		tp = ForwardRef(tp)
+
+	if isinstance(tp, ForwardRef):
+		return type_validator(getattr(builtins, tp.__forward_arg__))
+
+	origin = typing.get_origin(tp)
+	args = typing.get_args(tp)
+
+	if origin is typing.Union or origin is types.UnionType:
+		validators = tuple(type_validator(arg) for arg in args)
+
+		return lambda _: any(validator(_) for validator in validators)
+
+	if origin is tuple:
+		if len(args) == 0 or (len(args) == 2 and args[1] is Ellipsis):
+			if len(args) == 0:
+				return lambda _: isinstance(_, tuple)
+
+			item_validator = type_validator(args[0])
+
+			return lambda _: isinstance(_, tuple) and all(item_validator(item) for item in _)
+
+		item_validators = tuple(type_validator(arg) for arg in args)
+
+		return lambda _: isinstance(_, tuple) and len(_) == len(item_validators) and all(validator(item) for validator, item in zip(item_validators, _))
+
+	if origin is collections.abc.Callable or tp is Callable:
+		return callable
+
+	if origin is not None:
+		return lambda _: isinstance(_, origin)
+
+	if tp is float:
+		return lambda _: isinstance(_, (int, float)) and not isinstance(_, bool)
+
+	return lambda _: isinstance(_, tp)
+
+
 def gi(lst: list, arg: str, val: Any):
 	if isinstance(lst[0], dict):
 		return next((_ for _ in lst if _.get(arg, None) == val), None)
@@ -77,6 +269,196 @@ def gi(lst: list, arg: str, val: Any):
 		return next((_ for _ in lst if getattr(_, arg) == val), None)
 
 
+class TrackedDict(dict):
+	"""A dict that calls `on_change` whenever it is modified."""
+
+	on_change: Callable[[], None] | None = None
+
+	def _changed(self):
+		if self.on_change is not None:
+			self.on_change()
+
+	def __setitem__(self, key, value):
+		super().__setitem__(key, value)
+		self._changed()
+
+	def __delitem__(self, key):
+		super().__delitem__(key)
+		self._changed()
+
+	def __ior__(self, other):
+		super().__ior__(other)
+		self._changed()
+
+		return self
+
+	def update(self, *args, **kwargs):
+		super().update(*args, **kwargs)
+		self._changed()
+
+	def setdefault(self, key, default=None):
+		if key in self:
+			return self[key]
+
+		self[key] = default
+
+		return default
+
+	def pop(self, *args):
+		value = super().pop(*args)
+		self._changed()
+
+		return value
+
+	def popitem(self):
+		item = super().popitem()
+		self._changed()
+
+		return item
+
+	def clear(self):
+		super().clear()
+		self._changed()
+
+
+def diff_opcodes(old: Sequence, new: Sequence) -> List[Tuple[str, int, int, int, int]]:
+	"""
+	Returns `difflib` opcodes (tag, i1, i2, j1, j2) turning `old` into `new`.
+
+	The common prefix and suffix are skipped before diffing, so small edits of long lists stay cheap.
+	"""
+
+	n_old, n_new = len(old), len(new)
+	limit = min(n_old, n_new)
+
+	prefix = 0
+
+	while prefix < limit and old[prefix] == new[prefix]:
+		prefix += 1
+
+	suffix = 0
+
+	while suffix < limit - prefix and old[n_old - 1 - suffix] == new[n_new - 1 - suffix]:
+		suffix += 1
+
+	opcodes = []
+
+	if prefix:
+		opcodes.append(('equal', 0, prefix, 0, prefix))
+
+	old_end, new_end = n_old - suffix, n_new - suffix
+
+	if prefix == old_end and prefix < new_end:
+		opcodes.append(('insert', prefix, prefix, prefix, new_end))
+	elif prefix < old_end and prefix == new_end:
+		opcodes.append(('delete', prefix, old_end, prefix, prefix))
+	elif prefix < old_end:
+		matcher = difflib.SequenceMatcher(None, old[prefix:old_end], new[prefix:new_end])
+
+		for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+			opcodes.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+
+	if suffix:
+		opcodes.append(('equal', old_end, n_old, new_end, n_new))
+
+	return opcodes
+
+
+_TCL_SPECIAL = re.compile(r'[\\\[\]{}"$;\s]')
+_TCL_ESCAPES = {'\n': '\\n', '\t': '\\t', '\r': '\\r', '\v': '\\v', '\f': '\\f'}
+
+
+def tcl_word(value: str) -> str:
+	"""Quotes a string as a single word of a Tcl script, e.g. an argument in a command option given as a string."""
+
+	if not value:
+		return '{}'
+
+	return _TCL_SPECIAL.sub(lambda m: _TCL_ESCAPES.get(m[0], '\\' + m[0]), value)
+
+
+class RangeSet:
+	"""A set of integers stored as sorted, disjoint `[start, end)` ranges (e.g. selected rows)."""
+
+	def __init__(self):
+		self._starts: List[int] = []
+		self._ends: List[int] = []
+
+	# ---
+	def __contains__(self, i: int) -> bool:
+		k = bisect.bisect_right(self._starts, i) - 1
+
+		return k >= 0 and i < self._ends[k]
+
+	def __len__(self) -> int:
+		return sum(end - start for start, end in zip(self._starts, self._ends))
+
+	def __bool__(self) -> bool:
+		return bool(self._starts)
+
+	def __iter__(self) -> Iterator[int]:
+		for start, end in zip(self._starts, self._ends):
+			yield from range(start, end)
+
+	def ranges(self, start: int = None, end: int = None) -> List[Tuple[int, int]]:
+		"""Returns the ranges, clipped to `[start, end)` if given."""
+
+		if start is None and end is None:
+			return list(zip(self._starts, self._ends))
+
+		lo = 0 if start is None else bisect.bisect_right(self._ends, start)
+		hi = len(self._starts) if end is None else bisect.bisect_left(self._starts, end)
+
+		return [
+			(max(start_, start) if start is not None else start_, min(end_, end) if end is not None else end_)
+			for start_, end_ in zip(self._starts[lo:hi], self._ends[lo:hi])
+		]
+
+	# ---
+	def add(self, start: int, end: int):
+		if start >= end:
+			return
+
+		# ranges overlapping or touching [start, end)
+		lo = bisect.bisect_left(self._ends, start)
+		hi = bisect.bisect_right(self._starts, end)
+
+		if lo < hi:
+			start = min(start, self._starts[lo])
+			end = max(end, self._ends[hi - 1])
+
+		self._starts[lo:hi] = [start]
+		self._ends[lo:hi] = [end]
+
+	def remove(self, start: int, end: int):
+		if start >= end:
+			return
+
+		# ranges overlapping [start, end)
+		lo = bisect.bisect_right(self._ends, start)
+		hi = bisect.bisect_left(self._starts, end)
+
+		if lo >= hi:
+			return
+
+		starts, ends = [], []
+
+		if self._starts[lo] < start:
+			starts.append(self._starts[lo])
+			ends.append(start)
+
+		if self._ends[hi - 1] > end:
+			starts.append(end)
+			ends.append(self._ends[hi - 1])
+
+		self._starts[lo:hi] = starts
+		self._ends[lo:hi] = ends
+
+	def clear(self):
+		self._starts = []
+		self._ends = []
+
+
 def gen_rand_pt(x_range: Tuple[int, int] = (0, 500), y_range: Tuple[int, int] = (0, 500)):
 	return Point(random.randint(x_range[0], x_range[1]), random.randint(y_range[0], y_range[1]))
 
@@ -1,13 +1,22 @@
+import bisect
+import time
 import tkinter as tk
 import warnings
-from abc import ABC
-from typing import Callable, List
+from collections import deque
+from tkinter import ttk
+from abc import ABC, abstractmethod
+from typing import Callable, List, Dict, Any, Set, Type, Sequence, Tuple, Deque, Iterable
 
-from base_types import TkWidget, WidgetName, Orientation, SelectionMode, ActiveStyle
+from base_types import TkWidget, WidgetName, Orientation, SelectionMode, ActiveStyle, Backend, EventRate, FilterMode
 from base_widget import BaseWidget, BaseWidgetProperty
 from object import Object
+from pool import WidgetPool
+from provider import ItemProvider, ProviderLoad
+from scheduler import RateLimiter
+from search import ItemIndex, FilteredItems, id_opcodes
 from style import SupportedStyles, WidgetStyle
-from utils import gi
+from tracing import TRACER
+from utils import RangeSet, diff_opcodes, tcl_word
 
 
 # TODO
@@ -15,6 +24,22 @@ from utils import gi
 # - enable/disable
 
 
+# ---
+_TK_DEFAULT = object()
+
+
+def style_diff(old_options: Dict[str, Any], new_options: Dict[str, Any]) -> Dict[str, Any]:
+	"""Returns the options to configure to go from `old_options` to `new_options`."""
+
+	diff = {key: value for key, value in new_options.items() if old_options.get(key, _TK_DEFAULT) != value}
+
+	for key in old_options:
+		if key not in new_options:
+			diff[key] = _TK_DEFAULT
+
+	return diff
+
+
 # ---
 class WidgetProperty(BaseWidgetProperty):
 	tk_name: str
@@ -25,16 +50,31 @@ class Widget(BaseWidget, ABC):
 	name: WidgetName
 	properties: List[WidgetProperty]
 	supported_styles: SupportedStyles = SupportedStyles(False, False, False, False, False, False, False, False, False, False)
+	ttk_class: str | None = None
+	tk_class: str | None = None
+	poolable: bool = True  # whether unrendered Tk widgets are pooled for reuse (see `WidgetPool`)
 
 	# ---
 	@property
 	def style(self) -> WidgetStyle:
 		return self._style
 
+	@property
+	def uses_ttk(self) -> bool:
+		"""Whether the widget is rendered with the ttk backend (see `Backend`)."""
+
+		return self._uses_ttk
+
 	# constructor
 	def __init__(self, parent: Object = None, style: WidgetStyle = None):
 		super().__init__(parent, style)
 
+		self._tk_style_options: Dict[str, Any] | None = None
+		self._tk_default_options: Dict[str, Any] | None = None
+		self._uses_ttk = False
+		self._reused = False
+		self._dirty: Set[str] = set()
+
 	# modification
 	def update(self, **ppts):
 		"""
@@ -42,174 +82,283 @@ class Widget(BaseWidget, ABC):
 		:param ppts: Update properties.
 		"""
 
-		ppt_names = [_['name'] for _ in self.properties]
+		table = self.property_table
 
-		for ppt_name in ppts:
-			if ppt_name not in ppt_names:
+		for ppt_name, ppt_new_val in ppts.items():
+			ppt = table.get(ppt_name)
+
+			if ppt is None:
 				raise Exception(f'\'{ppt_name}\' is not a valid property of {self.__class__.__name__}.')
 
-			ppt = next((x for x in self.properties if x['name'] == ppt_names), None)
-			ppt_new_val = ppts[ppt_name]
+			if not ppt.validator(ppt_new_val):
+				raise Exception(f'\'{ppt_name}\' must be of type \'{ppt.type}\'.')
 
-			if not isinstance(ppt_new_val, ppt['type']):
-				raise Exception(f'\'{ppt_name}\' must be of type \'{ppt["type"]}\'.')
+		for ppt_name, ppt_new_val in ppts.items():
+			ppt = table[ppt_name]
+			ppt.set(self, ppt_new_val)
 
-			setattr(self, f'_ppt_{ppt_name}', ppt_new_val)
+			# properties with setters mark themselves
+			if ppt.setter is None:
+				self.mark_dirty(ppt_name)
 
-		if self._rendered:
-			self.config_tk_widget()
+	def mark_dirty(self, *ppt_names: str):
+		"""
+		Marks properties as changed, they are applied to the Tk widget on the window's next idle flush.
+
+		Changes made before rendering need no flushing as rendering configures all the properties.
+		"""
+
+		if not self._rendered:
+			return
+
+		self._dirty.update(ppt_names)
+
+		self.window.flusher.defer(self, self.flush)
+
+	def flush(self):
+		"""Applies the changed properties now, in a single `configure` call."""
+
+		if not self._dirty or self._tk_widget is None:
+			return
+
+		tracing = TRACER.enabled
+
+		if tracing:
+			start = TRACER.begin()
+
+		dirty = self._dirty
+		self._dirty = set()
+
+		# in declaration order, like a full configuration
+		self.apply_tk_options(self.tk_config_options([_ for _ in self.property_table if _ in dirty]))
+
+		if tracing:
+			TRACER.end('flush', self, start)
 
 	# Tk compatibility
+	def render(self, tk_parent: TkWidget) -> TkWidget:
+		self._uses_ttk = self.ttk_class is not None and self.window.backend == Backend.Ttk
+		self._tk_style_options = None
+		self._tk_default_options = None if self._uses_ttk else self.tk_default_options()
+		self._reused = False
+
+		return super().render(tk_parent)
+
+	def detach(self) -> Dict[str, Any] | None:
+		style_options = self._tk_style_options
+
+		if self._uses_ttk:
+			self.window.ttk_styler.release(self.id)
+
+		super().detach()
+
+		self._tk_style_options = None
+		self._dirty = set()
+
+		return style_options
+
+	def reuse_tk_widget(self, tk_parent: TkWidget) -> bool:
+		if not self.poolable:
+			return False
+
+		entry = self.window.widget_pool.acquire(WidgetPool.key(self, tk_parent, self._uses_ttk))
+
+		if entry is None:
+			return False
+
+		self._tk_widget, self._tk_style_options = entry
+		self._reused = True
+
+		return True
+
+	def release_tk_widget(self, tk_widget: TkWidget, style_options: Dict[str, Any] | None) -> bool:
+		if not self.poolable or style_options is None:
+			return False
+
+		manager = tk_widget.winfo_manager()
+
+		if manager:
+			getattr(tk_widget, f'{manager}_forget')()
+
+		return self.window.widget_pool.release(WidgetPool.key(self, tk_widget.master, self._uses_ttk), tk_widget, style_options)
+
+	def tk_default_options(self) -> Dict[str, Any] | None:
+		"""
+		Returns the style options Tk applies by itself from the option database (see `MainWindow.option_db`).
+
+		Must be called before creating the Tk widget, as it installs them on first use.
+		"""
+
+		if self.tk_class is None:
+			return None
+
+		option_db = self.window.option_db
+
+		if option_db is None:
+			return None
+
+		return option_db.defaults(self.theme, self.name, self.tk_class, self.supported_styles)
+
+	def ttk_create_options(self) -> Dict[str, Any]:
+		"""Returns the options to create the ttk widget with, so that styling it needs no separate configure call."""
+
+		self._tk_style_options = self.tk_style_options()
+
+		return self._tk_style_options
+
 	def config_tk_widget(self, which_ones: List[str] = None):
 		super().config_tk_widget(which_ones)
 
-		if which_ones is None:
-			which_ones = []
+		if self._tk_widget is None:
+			return
+
+		options = self.tk_config_options(which_ones)
+
+		# tkinter drops None options, so the values set before (by a previous owner of a pooled Tk widget, or an update)
+		# are reset to the Tk defaults instead, e.g. a `command` running another widget's listener
+		if self._reused or which_ones:
+			options = {
+				key: value if value is not None else self._tk_widget.configure(key)[3]
+				for key, value in options.items()
+			}
 
-		if len(which_ones) == 0:
-			for ppt in self.properties:
-				if ppt['custom_implementation']:
-					custom_func_name = f'config_{ppt["name"]}'
+		self.apply_tk_options(options)
 
-					if not hasattr(self, custom_func_name):
-						raise Exception(f'\'{self.__class__.__name__}\' must have function \'{custom_func_name}\' to configure the property \'{ppt["name"]}\'.')
+	def tk_config_options(self, which_ones: List[str] = None) -> Dict[str, Any]:
+		"""
+		Collects the Tk options of the given properties (all by default).
 
-					getattr(self, custom_func_name)()
+		Custom implementations (`config_<name>`) may return a dict of options to merge, or None when they configure the
+		Tk widget themselves.
+		"""
 
-				else:
-					self._tk_widget[ppt['tk_name']] = getattr(self, f'_ppt_{ppt["name"]}')
+		table = self.property_table
 
+		if which_ones is None or len(which_ones) == 0:
+			ppts = table.values()
 		else:
+			ppts = []
+
 			for ppt_name in which_ones:
-				_ = next((x for x in self.properties if x['name'] == ppt_name), None)
+				ppt = table.get(ppt_name)
 
-				if _ is None:
+				if ppt is None:
 					raise Exception(f'Cannot update \'{ppt_name}\' as it is not a property of \'{self.__class__.__name__}\'.')
 
-				ppt = _
+				ppts.append(ppt)
+
+		options = {}
 
-				# TODO: implement the following code only once (DRY)
-				if ppt['custom_implementation']:
-					custom_func_name = f'config_{ppt_name}'
+		for ppt in ppts:
+			if ppt.config is not None:
+				custom_options = ppt.config(self)
 
-					if not hasattr(self, custom_func_name):
-						raise Exception(f'\'{self.__class__.__name__}\' must have function \'{custom_func_name}\' to configure the property \'{ppt_name}\'.')
+				if custom_options is not None:
+					options.update(custom_options)
 
-					getattr(self, custom_func_name)()
+			else:
+				options[ppt.tk_name] = getattr(self, ppt.attr)
 
-				else:
-					self._tk_widget[ppt['tk_name']] = getattr(self, f'_ppt_{ppt_name}')
+		return options
 
 	def style_tk_widget(self):
 		super().style_tk_widget()
 
-		widget = self._tk_widget
-		theme = self.theme
+		if self._tk_widget is None:
+			return
+
+		if self._reused:
+			# styled by its previous owner, only the differences are left
+			self._reused = False
+			self.update_tk_style()
+
+			return
+
+		if self._uses_ttk and self._tk_style_options is not None:
+			# already passed when creating the widget
+			return
+
+		options = self.tk_style_options()
+		defaults = self._tk_default_options
 
-		active_styles_supported = self.supported_styles.active_styles
-		select_styles_supported = self.supported_styles.select_styles
-		inactive_select_styles_supported = self.supported_styles.inactive_select_styles
-		disabled_styles_supported = self.supported_styles.disabled_styles
-		read_only_styles_supported = self.supported_styles.read_only_styles
+		if defaults is None:
+			self.apply_tk_options(options)
+		elif options is not defaults:
+			self.apply_tk_options({key: value for key, value in options.items() if defaults.get(key, _TK_DEFAULT) != value})
 
-		# background
-		if self.supported_styles.bg:
-			bg = theme.color_(self.style.background)
-			bg_active = theme.color_(self.style.background_active)
-			bg_select = theme.color_(self.style.background_select)
-			bg_inactive_select = theme.color_(self.style.background_inactive_select)
-			bg_disabled = theme.color_(self.style.background_disabled)
-			bg_read_only = theme.color_(self.style.background_read_only)
+		self._tk_style_options = options
 
-			if bg is not None:
-				widget.configure(background=bg)
+	def restyle(self, diff_cache: Dict = None):
+		super().restyle(diff_cache)
 
-			if active_styles_supported:
-				if bg_active is not None:
-					widget.configure(activebackground=bg_active)
+		if not self._rendered or self._tk_style_options is None:
+			return
+
+		self.update_tk_style(diff_cache)
 
-			if select_styles_supported:
-				if bg_select is not None:
-					widget.configure(selectbackground=bg_select)
+	def update_tk_style(self, diff_cache: Dict = None):
+		"""Configures the Tk options that differ between the applied style options and the current ones."""
 
-			if inactive_select_styles_supported:
-				if bg_inactive_select is not None:
-					widget.configure(inactiveselectbackground=bg_inactive_select)
+		old_options = self._tk_style_options
+		new_options = self.tk_style_options()
+
+		if old_options is new_options:
+			return
 
-			if disabled_styles_supported:
-				if bg_disabled is not None:
-					widget.configure(disabledbackground=bg_disabled)
+		tracing = TRACER.enabled
 
-			if read_only_styles_supported:
-				if bg_read_only is not None:
-					widget.configure(readonlybackground=bg_read_only)
+		if tracing:
+			start = TRACER.begin()
 
-		# foreground
-		if self.supported_styles.fg:
-			fg = theme.color_(self.style.foreground)
-			fg_active = theme.color_(self.style.foreground_active)
-			fg_select = theme.color_(self.style.foreground_select)
-			fg_disabled = theme.color_(self.style.foreground_disabled)
+		key = (id(old_options), id(new_options))
+		cached = diff_cache.get(key) if diff_cache is not None else None
 
-			if fg is not None:
-				widget.configure(foreground=fg)
+		if cached is not None:
+			diff = cached[2]
+		else:
+			diff = style_diff(old_options, new_options)
 
-			if active_styles_supported:
-				if fg_active is not None:
-					widget.configure(activeforeground=fg_active)
+			# the option dicts are kept in the cache so that their ids cannot be reused
+			if diff_cache is not None:
+				diff_cache[key] = (old_options, new_options, diff)
 
-			if select_styles_supported:
-				if fg_select is not None:
-					widget.configure(selectforeground=fg_select)
+		if diff:
+			self.apply_tk_options({
+				key_: (value if value is not _TK_DEFAULT else self._tk_widget.configure(key_)[3])
+				for key_, value in diff.items()
+			})
 
-			if disabled_styles_supported:
-				if fg_disabled is not None:
-					widget.configure(disabledforeground=fg_disabled)
+		self._tk_style_options = new_options
 
-		# font
-		if self.supported_styles.font:
-			font = self.style.font
+		if tracing:
+			TRACER.end('restyle', self, start)
 
-			if font is not None:
-				widget.configure(font=font)
+	def tk_style_options(self) -> Dict[str, Any]:
+		"""Returns the Tk options of the widget's style. The returned dict may be shared and must not be modified."""
 
-		# cursor
-		widget.configure(cursor=self.style.cursor.value)
+		theme = self.theme
 
-		# border
-		if self.supported_styles.border:
-			border = self.style.border
+		if self._uses_ttk:
+			styler = self.window.ttk_styler
 
-			if border is not None:
-				# clr = border.color if isinstance(border.color, str) else rgb_to_hex(border.color)
+			if self.uses_theme_style:
+				styler.release(self.id)
 
-				widget.configure(
-					borderwidth=border.width,
-					relief=border.type.value
-				)
+				return styler.options(theme, self.name, self.ttk_class, self.supported_styles)
 
-				if active_styles_supported:
-					# widget.configure(activerelief=border.active_type.value)
-					pass
+			return styler.custom_options(self.id, theme.resolve(self.style), self.name, self.ttk_class, self.supported_styles)
 
-				if select_styles_supported:
-					widget.configure(selectborderwidth=border.select_width)
+		fonts = self.window.fonts
 
-		# highlight
-		if self.supported_styles.highlight:
-			highlight = self.style.highlight
+		if self.uses_theme_style:
+			return theme.compiled.named_options(self.name, self.supported_styles, fonts.name)
 
-			if highlight is not None:
-				clr = theme.color_(highlight.color)
-				bg_clr = theme.color_(highlight.background)
+		options = theme.resolve(self.style).tk_options(self.supported_styles)
 
-				widget.configure(
-					highlightcolor=clr,
-					highlightthickness=highlight.width
-				)
+		if 'font' in options:
+			options['font'] = fonts.name(options['font'])
 
-				if bg_clr is not None:
-					widget.configure(highlightbackground=bg_clr)
+		return options
 
 
 # mixins
@@ -220,18 +369,14 @@ class WidgetMixin(ABC):
 
 		super().__init__(**kwargs)
 
-		print('Initializing WidgetMixin.')
-
 
 class HasText(WidgetMixin):
 	def __init__(self, text: str, **kwargs):
 		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'text'), None) is None:
+		if 'text' not in self.property_table:
 			raise Exception(f'\'{self.__class__.__name__}\' must have \'text\' property.')
 
-		print('Initializing HasText.')
-
 		self._ppt_text = text
 
 	@property
@@ -241,90 +386,141 @@ class HasText(WidgetMixin):
 	@text.setter
 	def text(self, text: str):
 		self._ppt_text = text
-		self.config_tk_widget(which_ones=['text'])
+		self.mark_dirty('text')
 
 
-class HasVariableText(WidgetMixin):
-	def __init__(self, init_text: str = '', **kwargs):
+class TkVariableMixin(WidgetMixin):
+	"""
+	Keeps a value in Python and backs it with a Tk variable only once the widget is rendered.
+
+	Reads are served from the Python value, which a trace keeps in sync with the Tk variable (e.g. on user input).
+	Widgets that are never rendered allocate no Tcl variable at all.
+	"""
+
+	tk_var_class: Type[tk.Variable]
+	tk_var_ppt: str  # property holding the Tk variable
+	mirror_ppt: str  # property exposing the value
+
+	def __init__(self, init_value: Any, **kwargs):
 		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'txt_var'), None) is None:
-			raise Exception(f'\'{self.__class__.__name__}\' must have \'txt_var\' property.')
+		if self.tk_var_ppt not in self.property_table:
+			raise Exception(f'\'{self.__class__.__name__}\' must have \'{self.tk_var_ppt}\' property.')
+
+		self._mirror = init_value
+		setattr(self, self.property_table[self.tk_var_ppt].attr, None)
+
+	def detach(self):
+		# the Python value is kept, a new Tk variable is created when rendered again
+		setattr(self, self.property_table[self.tk_var_ppt].attr, None)
+
+		return super().detach()
+
+	def post_create(self):
+		super().post_create()
+
+		tk_var = self.tk_var_class(self._tk_widget, self._mirror)
+		tk_var.trace_add('write', self._on_tk_var_write)
+
+		setattr(self, self.property_table[self.tk_var_ppt].attr, tk_var)
+
+	@property
+	def tk_var(self) -> tk.Variable | None:
+		return getattr(self, self.property_table[self.tk_var_ppt].attr)
+
+	def _on_tk_var_write(self, *_):
+		try:
+			self._mirror = self.tk_var.get()
+		except tk.TclError:
+			# not a valid value (yet), e.g. a partially typed number
+			return
+
+		self.notify_watchers(self.mirror_ppt)
+
+	def set_mirror(self, value: Any):
+		self._mirror = value
 
-		self._ppt_txt_var = tk.StringVar(self._tk_widget, init_text)
+		tk_var = self.tk_var
+
+		if tk_var is not None:
+			tk_var.set(value)
+
+
+class HasVariableText(TkVariableMixin):
+	tk_var_class = tk.StringVar
+	tk_var_ppt = 'txt_var'
+	mirror_ppt = 'text'
+
+	def __init__(self, init_text: str = '', **kwargs):
+		super().__init__(init_text, **kwargs)
 
 	@property
 	def text(self) -> str:
-		return self._ppt_txt_var.get()
+		return self._mirror
 
 	@text.setter
 	def text(self, text: str):
-		self._ppt_txt_var.set(text)
-
+		self.set_mirror(text)
 
-class HasStrValue(WidgetMixin):
-	def __init__(self, init_value: str = '', **kwargs):
-		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'value'), None) is None:
-			raise Exception(f'\'{self.__class__.__name__}\' must have \'value\' property.')
+class HasStrValue(TkVariableMixin):
+	tk_var_class = tk.StringVar
+	tk_var_ppt = 'value'
+	mirror_ppt = 'value'
 
-		self._ppt_value = tk.StringVar(self._tk_widget, init_value)
+	def __init__(self, init_value: str = '', **kwargs):
+		super().__init__(init_value, **kwargs)
 
 	@property
 	def value(self) -> str:
-		return self._ppt_value.get()
+		return self._mirror
 
 	@value.setter
 	def value(self, text: str):
-		self._ppt_value.set(text)
-
+		self.set_mirror(text)
 
-class HasFloatValue(WidgetMixin):
-	def __init__(self, init_value: float = 0.0, **kwargs):
-		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'value'), None) is None:
-			raise Exception(f'\'{self.__class__.__name__}\' must have \'value\' property.')
+class HasFloatValue(TkVariableMixin):
+	tk_var_class = tk.DoubleVar
+	tk_var_ppt = 'value'
+	mirror_ppt = 'value'
 
-		self._ppt_value = tk.DoubleVar(self._tk_widget, init_value)
+	def __init__(self, init_value: float = 0.0, **kwargs):
+		super().__init__(init_value, **kwargs)
 
 	@property
 	def value(self) -> float:
-		return self._ppt_value.get()
+		return self._mirror
 
 	@value.setter
 	def value(self, value: float):
-		self._ppt_value.set(value)
-
+		self.set_mirror(value)
 
-class HasBoolValue(WidgetMixin):
-	def __init__(self, init_value: bool = False, **kwargs):
-		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'value'), None) is None:
-			raise Exception(f'\'{self.__class__.__name__}\' must have \'value\' property.')
+class HasBoolValue(TkVariableMixin):
+	tk_var_class = tk.BooleanVar
+	tk_var_ppt = 'value'
+	mirror_ppt = 'value'
 
-		self._ppt_value = tk.BooleanVar(self._tk_widget, init_value)
+	def __init__(self, init_value: bool = False, **kwargs):
+		super().__init__(init_value, **kwargs)
 
 	@property
 	def value(self) -> bool:
-		return self._ppt_value.get()
+		return self._mirror
 
 	@value.setter
 	def value(self, value: bool):
-		self._ppt_value.set(value)
+		self.set_mirror(value)
 
 
 class Clickable(WidgetMixin):
 	def __init__(self, click_listener: Callable = None, **kwargs):
 		super().__init__(**kwargs)
 
-		if next((x for x in self.properties if x['name'] == 'click_listener'), None) is None:
+		if 'click_listener' not in self.property_table:
 			raise Exception(f'\'{self.__class__.__name__}\' must have \'click_listener\' property.')
 
-		print('Initializing Clickable.')
-
 		self._ppt_click_listener = click_listener
 
 	@property
@@ -334,7 +530,90 @@ class Clickable(WidgetMixin):
 	@click_listener.setter
 	def click_listener(self, click_listener: Callable):
 		self._ppt_click_listener = click_listener
-		self.config_tk_widget(which_ones=['click_listener'])
+		self.mark_dirty('click_listener')
+
+
+class HasProvider(WidgetMixin):
+	"""
+	Fills the items of a widget from an `ItemProvider` without blocking the Tk thread (see `ProviderLoad`).
+
+	The widget can be rendered right away, the items are appended page by page as they arrive. `loading` can be
+	watched (e.g. to show a spinner). Loading another provider cancels the current load.
+	"""
+
+	def __init__(self, provider: ItemProvider = None, **kwargs):
+		"""
+		:param provider: Items appended to the initial ones as they are loaded.
+		"""
+
+		super().__init__(**kwargs)
+
+		self._load: ProviderLoad | None = None
+
+		if provider is not None:
+			self._start_load(provider)
+
+	@property
+	def loading(self) -> bool:
+		return self._load is not None and self._load.loading
+
+	def load(
+			self,
+			provider: ItemProvider,
+			on_done: Callable[[], Any] = None,
+			on_error: Callable[[BaseException], Any] = None,
+			page_size: int = 500
+	) -> ProviderLoad:
+		"""Replaces the items with the ones of the provider."""
+
+		self.cancel_load()
+		self.clear_loaded_items()
+
+		return self._start_load(provider, on_done, on_error, page_size)
+
+	def cancel_load(self):
+		load = self._load
+		self._load = None
+
+		if load is not None and load.loading:
+			load.cancel()
+			self.notify_watchers('loading')
+
+	def _start_load(
+			self,
+			provider: ItemProvider,
+			on_done: Callable[[], Any] = None,
+			on_error: Callable[[BaseException], Any] = None,
+			page_size: int = 500
+	) -> ProviderLoad:
+		def on_load_done():
+			self.notify_watchers('loading')
+
+			if on_done is not None:
+				on_done()
+
+		def on_load_error(e: BaseException):
+			self.notify_watchers('loading')
+
+			if on_error is None:
+				raise e
+
+			on_error(e)
+
+		self._load = ProviderLoad(self.window.tk_win, provider, self.append_loaded_items, on_load_done, on_load_error, page_size)
+		self._load.start()
+
+		self.notify_watchers('loading')
+
+		return self._load
+
+	@abstractmethod
+	def clear_loaded_items(self):
+		"""Removes the items before a load (see `load`)."""
+
+	@abstractmethod
+	def append_loaded_items(self, items: List[Any]):
+		"""Adds a page of loaded items."""
 
 
 # widgets
@@ -355,9 +634,14 @@ class Button(Clickable, HasText, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, False, True, False, False, True, False)
+	ttk_class = 'TButton'
+	tk_class = 'Button'
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.Button(master=tk_parent)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Button(master=tk_parent, **self.ttk_create_options())
+		else:
+			self._tk_widget = tk.Button(master=tk_parent)
 
 
 class Entry(HasVariableText, Widget):
@@ -371,17 +655,34 @@ class Entry(HasVariableText, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, True, False, True, True, True, True)
+	ttk_class = 'TEntry'
+	tk_class = 'Entry'
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.Entry(master=tk_parent)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Entry(master=tk_parent, **self.ttk_create_options())
+		else:
+			self._tk_widget = tk.Entry(master=tk_parent)
+
+
+class ComboBox(HasProvider, HasVariableText, Widget):
+	"""
+	A drop-down choice between options.
+
+	The menu is filled when it is posted rather than when rendered, and changing the options only touches the menu
+	entries that differ. All the entries call one registered Tcl command with their option, no Python callback is
+	created per option. With `page_size`, the menu shows one page of options at a time with entries to move between
+	pages. `filter` restricts the menu to the options matching a query, and typing while the combo box has the focus
+	selects the first option starting with the typed text (both use an `ItemIndex` of the options).
 
+	Options from a slow source can be loaded in the background with a provider (see `HasProvider`).
+	"""
 
-class ComboBox(HasVariableText, Widget):
 	name = WidgetName.ComboBox
 	properties = [
 		{
 			'name': 'txt_var',
-			'type': str,
+			'type': tk.StringVar,
 			'tk_name': 'textvariable',
 			'custom_implementation': False
 		},
@@ -393,28 +694,270 @@ class ComboBox(HasVariableText, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, False, True, False, False, True, False)
+	ttk_class = 'TMenubutton'
+	# no tk_class: tk.OptionMenu passes its own border and highlight options when created, overriding the option database
+	poolable = False  # its menu is built when created
+
+	typeahead_timeout = 1000  # ms, typing after a pause starts a new prefix
+
+	def __init__(self, options: List[str] = None, page_size: int | None = None, **kwargs):
+		"""
+		:param page_size: Options per page of the menu, all the options are in the menu if None.
+		"""
 
-	def __init__(self, options: List[str], **kwargs):
 		super().__init__(**kwargs)
 
-		self._ppt_options = options
+		self._ppt_options = options if options is not None else []
+		self.page_size = page_size
+
+		self._menu: tk.Menu | None = None
+		self._dispatch: str | None = None  # Tcl command of the menu entries
+		self._entries: List[tuple] = []  # entries in the Tk menu
+		self._menu_stale = True
+
+		self._index: ItemIndex | None = None
+		self._filter: Tuple[str, FilterMode] | None = None
+		self._shown_ids: Sequence[int] | None = None
+		self._page = 0
+
+		self._typed = ''
+		self._typed_time = 0.0
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.OptionMenu(tk_parent, None, None)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Menubutton(tk_parent, **self.ttk_create_options())
+			self._menu = tk.Menu(self._tk_widget, tearoff=False)
+
+			self._tk_widget.configure(menu=self._menu)
+		else:
+			self._tk_widget = tk.OptionMenu(tk_parent, None, None)
+			self._menu = self._tk_widget['menu']
+			self._menu.delete(0, 'end')
+
+	def post_create(self):
+		super().post_create()
+
+		self._dispatch = self._tk_widget.register(self._on_menu_command)
+
+		self._menu.configure(postcommand=self.sync_menu)
+		self._tk_widget.bind('<KeyPress>', self._on_tk_key, add='+')
+
+	def detach(self):
+		self._menu = None
+		self._dispatch = None
+		self._entries = []
+		self._menu_stale = True
+
+		return super().detach()
 
 	def config_options(self):
-		menu = self._tk_widget['menu']
-		menu.delete(0, 'end')
+		self.invalidate_menu()
+
+	@property
+	def options(self) -> List[str]:
+		return self._ppt_options
+
+	@options.setter
+	def options(self, options: List[str]):
+		# the search results refer to the previous options
+		self._ppt_options = options
+		self._index = None
+		self._shown_ids = None
+
+		self.invalidate_menu()
+		self.mark_dirty('options')
+
+	def append_options(self, options: List[str]):
+		"""Adds options at the end, updating the search index and the menu incrementally."""
+
+		self._ppt_options.extend(options)
+
+		if self._index is not None:
+			self._index.append(options)
+
+		self._shown_ids = None
+
+		self.invalidate_menu()
+
+	def clear_loaded_items(self):
+		self.update(options=[])
+
+	def append_loaded_items(self, items: List[str]):
+		self.append_options(items)
+
+	# ---
+	@property
+	def item_index(self) -> ItemIndex:
+		"""Search index over the options, built on first use."""
+
+		if self._index is None:
+			self._index = ItemIndex(self._ppt_options)
+
+		return self._index
+
+	@property
+	def shown_options(self) -> Sequence[str]:
+		"""The options matching the filter (all of them when not filtered)."""
+
+		if self._filter is None:
+			return self._ppt_options
+
+		if self._shown_ids is None:
+			self._shown_ids = self.item_index.search(*self._filter)
+
+		return FilteredItems(self._ppt_options, self._shown_ids)
+
+	@property
+	def page(self) -> int:
+		return self._page
+
+	@property
+	def page_count(self) -> int:
+		if self.page_size is None:
+			return 1
 
-		def gen_cmd(_: str):
-			return lambda: self._ppt_txt_var.set(_)
+		return max(1, -(-len(self.shown_options) // self.page_size))
 
-		for option in self._ppt_options:
-			menu.add_command(
-				label=option,
-				command=gen_cmd(option)
+	def show_page(self, page: int):
+		self._page = max(0, min(page, self.page_count - 1))
+
+		self.invalidate_menu()
+
+	def filter(self, query: str, mode: FilterMode = FilterMode.Prefix):
+		"""Restricts the menu to the options matching the query (case-insensitive), an empty query clears the filter."""
+
+		self._filter = (query, mode) if query else None
+		self._shown_ids = None
+		self._page = 0
+
+		self.invalidate_menu()
+
+	def select_prefix(self, prefix: str) -> bool:
+		"""Selects the first option starting with `prefix` (case-insensitive). Returns False if there is none."""
+
+		ids = self.item_index.search(prefix, FilterMode.Prefix)
+
+		if not ids:
+			return False
+
+		i = ids[0]
+		self.text = self._ppt_options[i]
+
+		if self.page_size is not None:
+			# the page showing the option, if shown
+			if self._filter is not None:
+				shown_ids = self._shown_ids if self._shown_ids is not None else self.item_index.search(*self._filter)
+				j = bisect.bisect_left(shown_ids, i)
+				i = j if j < len(shown_ids) and shown_ids[j] == i else None
+
+			if i is not None:
+				self.show_page(i // self.page_size)
+
+		return True
+
+	def _on_tk_key(self, event: tk.Event):
+		char = event.char
+
+		if not char or not char.isprintable():
+			return
+
+		now = time.monotonic()
+
+		if (now - self._typed_time) * 1000 > self.typeahead_timeout:
+			self._typed = ''
+
+		self._typed += char
+		self._typed_time = now
+
+		self.select_prefix(self._typed)
+
+	# menu
+	def menu_entries(self) -> List[tuple]:
+		"""Describes the entries the menu should have: ('option', option), ('separator',) or ('page', delta, enabled)."""
+
+		shown = self.shown_options
+		page_size = self.page_size
+
+		if page_size is None:
+			return [('option', _) for _ in shown]
+
+		self._page = page = min(self._page, self.page_count - 1)
+		start = page * page_size
+
+		entries = [('option', _) for _ in shown[start:start + page_size]]
+
+		if len(shown) > page_size:
+			entries.append(('separator',))
+			entries.append(('page', -1, page > 0))
+			entries.append(('page', 1, start + page_size < len(shown)))
+
+		return entries
+
+	def invalidate_menu(self):
+		"""Updates the menu now if it is posted, else when it is posted next."""
+
+		self._menu_stale = True
+
+		if self._menu is not None and self._menu.winfo_ismapped():
+			self.sync_menu()
+
+	def sync_menu(self):
+		"""Brings the Tk menu up to date, only changing the entries that differ."""
+
+		if not self._menu_stale or self._menu is None:
+			return
+
+		self._menu_stale = False
+
+		menu = self._menu
+		old_entries = self._entries
+		self._entries = entries = self.menu_entries()
+
+		opcodes = [_ for _ in diff_opcodes(old_entries, entries) if _[0] != 'equal']
+
+		# deleting from the end keeps the indices of the previous opcodes valid
+		for _, i1, i2, __, ___ in reversed(opcodes):
+			if i2 > i1:
+				menu.delete(i1, i2 - 1)
+
+		for _, __, ___, j1, j2 in opcodes:
+			for j in range(j1, j2):
+				self._insert_menu_entry(j, entries[j])
+
+	def _insert_menu_entry(self, i: int, entry: tuple):
+		menu = self._menu
+		kind = entry[0]
+
+		if kind == 'option':
+			# the option is an argument of the shared command
+			menu.insert_command(i, label=entry[1], command=f'{self._dispatch} select {tcl_word(entry[1])}')
+		elif kind == 'separator':
+			menu.insert_separator(i)
+		else:
+			menu.insert_command(
+				i,
+				label='◀ Previous' if entry[1] < 0 else 'Next ▶',
+				command=f'{self._dispatch} page {entry[1]}',
+				state=tk.NORMAL if entry[2] else tk.DISABLED
 			)
 
+	def _on_menu_command(self, action: str, arg: str):
+		if action == 'select':
+			self.text = arg
+			return
+
+		self.show_page(self._page + int(arg))
+
+		# the menu is unposted when an entry is invoked, posting it again on the new page
+		self._tk_widget.after_idle(self._post_menu)
+
+	def _post_menu(self):
+		if self._tk_widget is None:
+			return
+
+		tk_widget = self._tk_widget
+		self._menu.tk_popup(tk_widget.winfo_rootx(), tk_widget.winfo_rooty() + tk_widget.winfo_height())
+
 
 class SpinBox(HasFloatValue, Widget):
 	name = WidgetName.SpinBox
@@ -452,6 +995,8 @@ class SpinBox(HasFloatValue, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, True, True, True, True, True, True)
+	ttk_class = 'TSpinbox'
+	tk_class = 'Spinbox'
 
 	def __init__(self, minimum: float, maximum: float, delta: float, txt_fmt: str = None, **kwargs):
 		super().__init__(**kwargs)
@@ -459,10 +1004,13 @@ class SpinBox(HasFloatValue, Widget):
 		self._ppt_minimum = minimum
 		self._ppt_maximum = maximum
 		self._ppt_delta = delta
-		self._ppt_txt_fmt = txt_fmt if txt_fmt is not None else gi(self.properties, 'name', 'txt_fmt')['default']
+		self._ppt_txt_fmt = txt_fmt if txt_fmt is not None else self.property_table['txt_fmt'].default
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.Spinbox(tk_parent)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Spinbox(tk_parent, **self.ttk_create_options())
+		else:
+			self._tk_widget = tk.Spinbox(tk_parent)
 
 
 class CheckBox(HasBoolValue, Clickable, HasText, Widget):
@@ -488,9 +1036,14 @@ class CheckBox(HasBoolValue, Clickable, HasText, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, False, True, False, False, True, False)
+	ttk_class = 'TCheckbutton'
+	tk_class = 'Checkbutton'
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.Checkbutton(tk_parent)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Checkbutton(tk_parent, **self.ttk_create_options())
+		else:
+			self._tk_widget = tk.Checkbutton(tk_parent)
 
 
 class Slider(HasFloatValue, Widget):
@@ -541,6 +1094,7 @@ class Slider(HasFloatValue, Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, True, False, False, False, True, True)
+	tk_class = 'Scale'
 
 	def __init__(
 			self,
@@ -563,12 +1117,14 @@ class Slider(HasFloatValue, Widget):
 		self._tk_widget = tk.Scale(tk_parent)
 
 	def config_orientation(self):
-		self._tk_widget.configure(orient=self._ppt_orientation.value)
+		return {'orient': self._ppt_orientation.value}
 
 
 class RadioButton(HasText, Widget):
 	name = WidgetName.RadioButton
 	supported_styles = SupportedStyles(True, True, True, True, True, True, False, False, True, True)
+	ttk_class = 'TRadiobutton'
+	tk_class = 'Radiobutton'
 	properties = [
 		{
 			'name': 'text',
@@ -590,17 +1146,20 @@ class RadioButton(HasText, Widget):
 		}
 	]
 
-	def __init__(self, value: str, variable: tk.StringVar, **kwargs):
+	def __init__(self, value: str, variable: tk.StringVar = None, **kwargs):
 		super().__init__(**kwargs)
 
 		self._ppt_value = value
 		self._ppt_variable = variable
 
 	def create_tk_widget(self, tk_parent: TkWidget):
-		self._tk_widget = tk.Radiobutton(tk_parent)
+		if self._uses_ttk:
+			self._tk_widget = ttk.Radiobutton(tk_parent, **self.ttk_create_options())
+		else:
+			self._tk_widget = tk.Radiobutton(tk_parent)
 
 
-class ListBox(Widget):
+class ListBox(HasProvider, Widget):
 	# TODO: add scrollbar
 
 	name = WidgetName.ListBox
@@ -619,38 +1178,150 @@ class ListBox(Widget):
 		}
 	]
 	supported_styles = SupportedStyles(True, True, True, True, True, True, True, True, True, True)
+	tk_class = 'Listbox'
+	poolable = False  # its items are inserted when created
+
+	insert_chunk_size = 1000  # rows per Tk insert call
+	insert_time_slice = 10  # ms of inserting per event-loop turn, for inserts of more than one chunk
 
 	# ---
-	def __init__(self, items: List[str], selection_mode: SelectionMode = SelectionMode.Single, active_item_style: ActiveStyle = ActiveStyle.No, **kwargs):
+	def __init__(
+			self,
+			items: List[str] = None,
+			selection_mode: SelectionMode = SelectionMode.Single,
+			active_item_style: ActiveStyle = ActiveStyle.No,
+			searchable: bool = False,
+			**kwargs
+	):
+		""":param searchable: Builds `item_index` in the background while rendered, so that the first `filter` doesn't."""
+
 		super().__init__(**kwargs)
 
-		self._items = items
+		self._items = items if items is not None else []
+		self.searchable = searchable
 
 		self._ppt_selection_mode = selection_mode
 		self._ppt_active_item_style = active_item_style
 
+		# rows in `_items` not inserted into the Tk listbox yet: [index, items, inserted count, selected items]
+		self._insert_jobs: Deque[list] = deque()
+		self._insert_callbacks: List[Callable[[], Any]] = []
+		self._insert_after = None
+
+		# filtering (`_items` are then the shown items)
+		self._index: ItemIndex | None = None
+		self._filter: Tuple[str, FilterMode] | None = None
+		self._all_items: List[str] | None = None
+		self._shown_ids: List[int] | None = None
+		self._index_after = None
+
 	def create_tk_widget(self, tk_parent: TkWidget):
 		self._tk_widget = tk.Listbox(tk_parent)
 
 	def post_create(self):
-		print('F')
 		self.add_items_to_list_box()
+		self.index_later()
 
-	# ---
-	def add_items_to_list_box(self):
-		self._tk_widget.insert(tk.END, *self._items)
+	def detach(self):
+		self._insert_jobs.clear()
+		self._insert_callbacks = []
+		self._insert_after = None
 
-	def config_selection_mode(self):
-		self._tk_widget.configure(selectmode=self._ppt_selection_mode.value)
+		if self._index_after is not None:
+			self.window.tk_win.after_cancel(self._index_after)
+			self._index_after = None
 
-	def config_active_item_style(self):
-		self._tk_widget.configure(activestyle=self._ppt_active_item_style.value)
+		return super().detach()
 
 	# ---
-	def style_tk_widget(self):
-		super().style_tk_widget()
+	def add_items_to_list_box(self):
+		self.insert_rows(0, self._items)
 
-		self._tk_widget.configure(selectborderwidth=0, activestyle='none')
+	def insert_rows(self, i: int, items: List[str], selected: Set[int] = None, on_done: Callable[[], Any] = None):
+		"""
+		Inserts rows into the Tk listbox (already in `_items`).
+
+		More than `insert_chunk_size` rows are inserted in chunks, `insert_time_slice` ms per event-loop turn, so that
+		the UI stays responsive. `on_done` is called once the Tk listbox holds all the rows.
+
+		:param selected: Indices (in the Tk listbox) of rows to select among the inserted ones.
+		"""
+
+		if items:
+			# a copy, the items may change before all the rows are inserted
+			self._insert_jobs.append([i, list(items), 0, sorted(selected) if selected else None])
+
+		if on_done is not None:
+			self._insert_callbacks.append(on_done)
+
+		if self._insert_after is None:
+			self._insert_step()
+
+	def _insert_step(self, time_slice: float = None):
+		self._insert_after = None
+
+		lb = self._tk_widget
+		jobs = self._insert_jobs
+		chunk_size = self.insert_chunk_size
+		deadline = time.perf_counter() + (time_slice if time_slice is not None else self.insert_time_slice) / 1000
+
+		while jobs:
+			job = jobs[0]
+			i, items, done, selected = job
+
+			chunk = items[done:done + chunk_size]
+			start = i + done
+			lb.insert(start, *chunk)
+
+			if selected:
+				for index in selected[bisect.bisect_left(selected, start):bisect.bisect_left(selected, start + len(chunk))]:
+					lb.selection_set(index)
+
+			job[2] = done = done + len(chunk)
+
+			if done >= len(items):
+				jobs.popleft()
+
+			if jobs and time.perf_counter() >= deadline:
+				self._insert_after = lb.after(1, self._insert_step)
+				return
+
+		callbacks = self._insert_callbacks
+		self._insert_callbacks = []
+
+		for callback in callbacks:
+			callback()
+
+	@property
+	def inserting(self) -> bool:
+		"""Whether rows are still being inserted into the Tk listbox (see `insert_rows`)."""
+
+		return bool(self._insert_jobs)
+
+	def finish_inserting(self):
+		"""Inserts the remaining rows now."""
+
+		if not self._insert_jobs and not self._insert_callbacks:
+			return
+
+		if self._insert_after is not None:
+			self._tk_widget.after_cancel(self._insert_after)
+
+		self._insert_step(time_slice=float('inf'))
+
+	def config_selection_mode(self):
+		return {'selectmode': self._ppt_selection_mode.value}
+
+	def config_active_item_style(self):
+		return {'activestyle': self._ppt_active_item_style.value}
+
+	# ---
+	def tk_style_options(self) -> Dict[str, Any]:
+		options = dict(super().tk_style_options())
+
+		options.update(selectborderwidth=0, activestyle='none')
+
+		return options
 
 	# ---
 	@property
@@ -674,6 +1345,8 @@ class ListBox(Widget):
 		if not self._rendered:
 			raise Exception('ListBox must be rendered to get selected indices.')
 
+		self.finish_inserting()
+
 		return list(self._tk_widget.curselection())
 
 	# ---
@@ -688,6 +1361,7 @@ class ListBox(Widget):
 			warnings.warn('Selecting multiple indices while in \'single\' selection mode. Operation cancelled!', RuntimeWarning)
 			return
 
+		self.finish_inserting()
 		self._tk_widget.selection_set(start, end)
 
 	def select_all(self):
@@ -701,6 +1375,7 @@ class ListBox(Widget):
 		if not self._rendered:
 			raise Exception('ListBox must be rendered to unselect indices.')
 
+		self.finish_inserting()
 		self._tk_widget.selection_clear(start, end)
 
 	def unselect_all(self):
@@ -711,7 +1386,23 @@ class ListBox(Widget):
 		self.remove_items(i, i)
 
 	def remove_items(self, start: int, end: int):
-		del self._items[start:end]
+		"""Removes the items from `start` to `end` (both included)."""
+
+		if end < start:
+			return
+
+		if self._filter is not None:
+			raise Exception('Cannot remove items by index while the ListBox is filtered.')
+
+		if self._rendered:
+			self.finish_inserting()
+
+		del self._items[start:end + 1]
+
+		if self._index is not None:
+			self._index.delete(start, end + 1)
+
+		self.index_later()
 
 		if self._rendered:
 			self._tk_widget.delete(start, end)
@@ -720,28 +1411,709 @@ class ListBox(Widget):
 		self.remove_items(0, self.count - 1)
 
 	# ---
-	def set_items(self, new_items: List[str]):
-		self.unselect_all()
-		self.remove_all_items()
+	def set_items(self, new_items: List[str], on_done: Callable[[], Any] = None):
+		"""
+		Replaces the items, only inserting/deleting the rows that changed. Selected rows that are kept stay selected.
 
-		self._items = new_items
+		:param on_done: Called once the Tk listbox shows all the new items (see `insert_rows`).
+		"""
 
-		if self._rendered:
-			self.add_items_to_list_box()
+		old_items = self._items
+
+		if self._filter is not None:
+			# replaces all the items, the filter applies to the new ones; the ids of the shown rows refer to the old
+			# items, so the rows are diffed by their items
+			self._all_items = new_items
+			self.item_index.set_items(new_items)
+
+			self._shown_ids = self.item_index.search(*self._filter)
+			new_items = [new_items[i] for i in self._shown_ids]
+
+			self._items = new_items
+		else:
+			self._items = new_items
+			self._index = None
+			self.index_later()
+
+		if not self._rendered:
+			if on_done is not None:
+				on_done()
+
+			return
+
+		self.finish_inserting()
+
+		self.update_rows(old_items, new_items, [_ for _ in diff_opcodes(old_items, new_items) if _[0] != 'equal'], on_done)
+
+	def update_rows(self, old_items: List[str], new_items: List[str], opcodes: List[Tuple[str, int, int, int, int]], on_done: Callable[[], Any] = None):
+		"""Turns the rows of the Tk listbox from `old_items` into `new_items`, applying the (non-equal) opcodes."""
+
+		lb = self._tk_widget
+
+		if len(opcodes) > max(64, len(new_items) // 100):
+			# more Tk calls than reloading all the rows, the kept selected rows are selected again at their new index
+			selected = set()
+			k, shift = 0, 0
+
+			for i in lb.curselection():
+				while k < len(opcodes) and opcodes[k][2] <= i:
+					_, i1, i2, j1, j2 = opcodes[k]
+					shift += (j2 - j1) - (i2 - i1)
+					k += 1
+
+				# not deleted nor replaced
+				if k == len(opcodes) or i < opcodes[k][1]:
+					selected.add(i + shift)
+
+			lb.delete(0, tk.END)
+			self.insert_rows(0, new_items, selected, on_done)
+
+			return
+
+		# deleting from the end keeps the indices of the previous opcodes valid (Tk moves the selection with the rows)
+		for _, i1, i2, __, ___ in reversed(opcodes):
+			if i2 > i1:
+				lb.delete(i1, i2 - 1)
+
+		# the kept rows are now in place, inserting in order at the new indices
+		for _, __, ___, j1, j2 in opcodes:
+			if j2 > j1:
+				self.insert_rows(j1, new_items[j1:j2])
+
+		self.insert_rows(0, [], on_done=on_done)
 
 	# ---
 	def add_item(self, item: str, i: int):
 		self.add_items([item], i)
 
-	def add_items(self, items: List[str], i: int):
+	def add_items(self, items: List[str], i: int, on_done: Callable[[], Any] = None):
+		if self._filter is not None:
+			raise Exception('Cannot add items by index while the ListBox is filtered.')
+
+		if self._rendered:
+			self.finish_inserting()
+
+		if self._index is not None:
+			if i == len(self._items):
+				self._index.append(items)
+			else:
+				self._index.insert(i, items)
+
 		self._items[i:i] = items
 
+		self.index_later()
+
 		if self._rendered:
-			self._tk_widget.insert(i, *items)
+			self.insert_rows(i, items, on_done=on_done)
+		elif on_done is not None:
+			on_done()
 
 	def append_item(self, item: str):
 		self.append_items([item])
 
-	def append_items(self, items: List[str]):
-		self.add_items(items, self.count - 1)
+	def append_items(self, items: List[str], on_done: Callable[[], Any] = None):
+		if self._filter is not None:
+			self._all_items.extend(items)
+			self._index.append(items)
+
+			self.filter(*self._filter, on_done=on_done)
+
+			return
+
+		self.add_items(items, self.count, on_done)
+
+	def clear_loaded_items(self):
+		self.set_items([])
+
+	def append_loaded_items(self, items: List[str]):
+		self.append_items(items)
+
+	# filtering
+	@property
+	def item_index(self) -> ItemIndex:
+		"""Search index over all the items, created on first use and kept up to date by the item methods."""
+
+		if self._index is None:
+			self._index = ItemIndex(self._all_items if self._all_items is not None else self._items)
+
+		return self._index
+
+	def index_later(self):
+		"""
+		With `searchable`, builds the pending segments of `item_index` in the background, `insert_time_slice` ms per
+		event-loop turn. Called when rendered and after the items change.
+		"""
+
+		if not self.searchable or self._tk_widget is None or self._index_after is not None:
+			return
+
+		if self.item_index.pending:
+			self._index_after = self.window.tk_win.after(1, self._index_step)
+
+	def _index_step(self):
+		self._index_after = None
+
+		if self._index is not None and self._index.build(self.insert_time_slice):
+			self._index_after = self.window.tk_win.after(1, self._index_step)
+
+	@property
+	def filtered(self) -> bool:
+		return self._filter is not None
+
+	@property
+	def all_items(self) -> List[str]:
+		"""All the items, including the ones hidden by the filter."""
+
+		return self._all_items if self._all_items is not None else self._items
+
+	def filter(self, query: str, mode: FilterMode = FilterMode.Substring, on_done: Callable[[], Any] = None):
+		"""
+		Shows only the items matching the query (case-insensitive), e.g. on every keystroke of a search field.
+
+		Matching uses `item_index`, which looks only at the entries of the query's characters (see `ItemIndex`) and
+		builds what is not indexed yet (see `searchable`). The rows are updated through a diff. While filtered,
+		`set_items` and `append_items` apply to all the items, adding/removing items by index is not possible.
+		"""
+
+		if not query:
+			self.clear_filter(on_done)
+			return
+
+		index = self.item_index
+
+		if self._filter is None:
+			self._all_items = self._items
+			self._shown_ids = range(len(self._items))
+
+		self._filter = (query, mode)
+
+		self._show_ids(index.search(query, mode), on_done)
+
+	def clear_filter(self, on_done: Callable[[], Any] = None):
+		if self._filter is None:
+			if on_done is not None:
+				on_done()
+
+			return
+
+		all_items = self._all_items
+
+		self._show_ids(range(len(all_items)), on_done)
+
+		self._items = all_items
+		self._all_items = None
+		self._shown_ids = None
+		self._filter = None
+
+	def _show_ids(self, ids: Sequence[int], on_done: Callable[[], Any] = None):
+		all_items = self._all_items
+		old_ids = self._shown_ids
+		old_items = self._items
+
+		self._shown_ids = ids
+		self._items = [all_items[i] for i in ids]
+
+		if not self._rendered:
+			if on_done is not None:
+				on_done()
+
+			return
+
+		self.finish_inserting()
+
+		self.update_rows(old_items, self._items, id_opcodes(old_ids, ids), on_done)
+
+
+class VirtualListBox(ListBox):
+	"""
+	A ListBox showing a data source (anything with `len()` and `__getitem__`, e.g. a list of 500k log lines) without
+	copying it into Tk.
+
+	Only the rows in view plus `overscan` rows on each side are inserted into the Tk listbox, they are replaced as the
+	view moves. The selection is kept in Python as index ranges, so selecting, counting and scrolling cost O(visible
+	rows) whatever the size of the source.
+
+	The Tk listbox only scrolls through the rows in it, scrollbars must use `yview` and `scroll_listener` instead of
+	the Tk listbox's own.
+	"""
+
+	# ---
+	def __init__(
+			self,
+			source: Sequence[str] = None,
+			overscan: int = 20,
+			scroll_listener: Callable[[float, float], Any] = None,
+			**kwargs
+	):
+		"""
+		:param source: Rows, converted with `str`. Call `refresh` after modifying it.
+		:param overscan: Rows kept in the Tk listbox beyond each edge of the view.
+		:param scroll_listener: Called with the (first, last) fractions of the view, e.g. a scrollbar's `set`.
+		"""
+
+		super().__init__(source, **kwargs)
+
+		self.overscan = overscan
+		self.scroll_listener = scroll_listener
+
+		self._selection = RangeSet()
+
+		self._first = 0  # first row in view
+		self._rows = 10  # rows in view
+		self._start = 0  # rows in the Tk listbox
+		self._end = 0
+
+	def create_tk_widget(self, tk_parent: TkWidget):
+		# the selection lives in Python, it is not exported as the X selection
+		self._tk_widget = tk.Listbox(tk_parent, exportselection=False)
+
+	def post_create(self):
+		lb = self._tk_widget
+
+		lb.configure(yscrollcommand=self._on_tk_scroll)
+
+		lb.bind('<<ListboxSelect>>', self._on_tk_select)
+		lb.bind('<Configure>', RateLimiter(self.window.tk_win, self._on_tk_resize, EventRate.Latest))
+
+		self._rows = int(lb.cget('height'))
+
+		self.materialize()
+		self.index_later()
+
+	# ---
+	def materialize(self):
+		"""Fills the Tk listbox with the rows around the view."""
+
+		n = len(self._items)
+
+		first = max(0, min(self._first, n - self._rows))
+		start = max(0, first - self.overscan)
+		end = min(n, first + self._rows + self.overscan)
+
+		self._first, self._start, self._end = first, start, end
+
+		if self._tk_widget is None:
+			return
+
+		lb = self._tk_widget
+		lb.delete(0, tk.END)
+
+		if start < end:
+			items = self._items
+			lb.insert(0, *[str(items[i]) for i in range(start, end)])
+
+		for start_, end_ in self._selection.ranges(start, end):
+			lb.selection_set(start_ - start, end_ - 1 - start)
+
+		lb.yview(first - start)
+
+		self._notify_scroll()
+
+	def refresh(self):
+		"""Shows the changes made to the data source."""
+
+		if self._tk_widget is not None:
+			self.materialize()
+
+	def _on_tk_scroll(self, *_):
+		# the Tk listbox scrolled by itself (mouse wheel, keys, drag-selecting)
+
+		self._first = self._start + self._tk_widget.nearest(0)
+
+		if self._in_window(self._first):
+			self._notify_scroll()
+		else:
+			self.materialize()
+
+	def _in_window(self, first: int) -> bool:
+		# whether the view starting at `first` is in the Tk listbox, at least half the overscan away from its edges
+		start, end, n = self._start, self._end, len(self._items)
+		margin = self.overscan // 2
+
+		if first < start or min(first + self._rows, n) > end:
+			return False
+
+		return (first - start >= margin or start == 0) and (end - first - self._rows >= margin or end == n)
+
+	def _on_tk_resize(self, event: tk.Event):
+		lb = self._tk_widget
+
+		row_height = int(lb.tk.call('font', 'metrics', lb.cget('font'), '-linespace')) + 1
+		inset = 2 * (int(lb.cget('borderwidth')) + int(lb.cget('highlightthickness')))
+
+		rows = max(1, -(-(event.height - inset) // row_height))
+
+		if rows != self._rows:
+			self._rows = rows
+			self.materialize()
+
+	def _on_tk_select(self, _):
+		start = self._start
+		selected = self._tk_widget.curselection()
+
+		if selected and self._ppt_selection_mode == SelectionMode.Single:
+			self._selection.clear()
+		else:
+			self._selection.remove(start, self._end)
+
+		for i in selected:
+			self._selection.add(start + i, start + i + 1)
+
+	def _notify_scroll(self):
+		if self.scroll_listener is not None:
+			self.scroll_listener(*self.yview())
+
+	# scrolling
+	def yview(self, *args) -> Tuple[float, float] | None:
+		"""
+		Scrollbar protocol: returns the (first, last) fractions of the view, or moves it ('moveto', fraction) /
+		('scroll', count, 'units' | 'pages').
+		"""
+
+		n = len(self._items)
+
+		if not args:
+			if n == 0:
+				return 0.0, 1.0
+
+			return self._first / n, min(1.0, (self._first + self._rows) / n)
+
+		if args[0] == 'moveto':
+			self.scroll_to(int(float(args[1]) * n))
+		elif args[0] == 'scroll':
+			count = int(args[1])
+			self.scroll_to(self._first + (count * self._rows if args[2] == 'pages' else count))
+
+		return None
+
+	def scroll_to(self, i: int):
+		"""Scrolls the given row to the top of the view."""
+
+		n = len(self._items)
+		first = max(0, min(i, n - self._rows))
+
+		if first == self._first:
+			return
+
+		self._first = first
+
+		if self._tk_widget is None:
+			return
+
+		if self._in_window(first):
+			self._tk_widget.yview(first - self._start)
+			self._notify_scroll()
+		else:
+			self.materialize()
+
+	def see(self, i: int):
+		"""Scrolls the given row into view."""
+
+		if i < self._first:
+			self.scroll_to(i)
+		elif i >= self._first + self._rows:
+			self.scroll_to(i - self._rows + 1)
+
+	# ---
+	@property
+	def source(self) -> Sequence[str]:
+		return self._items
+
+	@property
+	def selected_count(self) -> int:
+		return len(self._selection)
+
+	@property
+	def selected_indices(self) -> List[int]:
+		return list(self._selection)
+
+	@property
+	def selected_ranges(self) -> List[Tuple[int, int]]:
+		"""The selected rows as `[start, end)` ranges."""
+
+		return self._selection.ranges()
+
+	@property
+	def selected_items(self) -> List[str]:
+		return [self._items[i] for i in self._selection]
+
+	def is_selected(self, i: int) -> bool:
+		return i in self._selection
+
+	# ---
+	def select_indices(self, start: int, end: int):
+		if start != end and self._ppt_selection_mode == SelectionMode.Single:
+			warnings.warn('Selecting multiple indices while in \'single\' selection mode. Operation cancelled!', RuntimeWarning)
+			return
+
+		if self._ppt_selection_mode == SelectionMode.Single:
+			self._selection.clear()
+
+		self._selection.add(start, end + 1)
+		self._sync_tk_selection()
+
+	def unselect_indices(self, start: int, end: int):
+		self._selection.remove(start, end + 1)
+		self._sync_tk_selection()
+
+	def unselect_all(self):
+		self._selection.clear()
+		self._sync_tk_selection()
+
+	def _sync_tk_selection(self):
+		if self._tk_widget is None:
+			return
+
+		lb = self._tk_widget
+		start = self._start
+
+		lb.selection_clear(0, tk.END)
+
+		for start_, end_ in self._selection.ranges(start, self._end):
+			lb.selection_set(start_ - start, end_ - 1 - start)
+
+	# ---
+	def set_items(self, new_items: Sequence[str], on_done: Callable[[], Any] = None):
+		"""Replaces the data source (the selection is cleared)."""
+
+		self._selection.clear()
+
+		if self._filter is not None:
+			self._all_items = new_items
+			self.item_index.set_items(new_items)
+
+			self.filter(*self._filter, on_done=on_done)
+
+			return
+
+		self._items = new_items
+		self._index = None
+
+		self.index_later()
+
+		self.refresh()
+
+		if on_done is not None:
+			on_done()
+
+	def add_items(self, items: List[str], i: int, on_done: Callable[[], Any] = None):
+		if self._filter is not None:
+			raise Exception('Cannot add items by index while the ListBox is filtered.')
+
+		if self._index is not None:
+			if i == len(self._items):
+				self._index.append(items)
+			else:
+				self._index.insert(i, items)
+
+		self._items[i:i] = items
+
+		self.index_later()
+
+		self._shift_selection(i, len(items))
+		self.refresh()
+
+		if on_done is not None:
+			on_done()
+
+	def remove_items(self, start: int, end: int):
+		if self._filter is not None:
+			raise Exception('Cannot remove items by index while the ListBox is filtered.')
+
+		if self._index is not None:
+			self._index.delete(start, end + 1)
+
+		del self._items[start:end + 1]
+
+		self.index_later()
+
+		self._selection.remove(start, end + 1)
+		self._shift_selection(end + 1, start - end - 1)
+		self.refresh()
+
+	def remove_all_items(self):
+		self.set_items([])
+
+	def _show_ids(self, ids: Sequence[int], on_done: Callable[[], Any] = None):
+		# the source is not copied, only viewed through the ids; the selection follows its items
+		old_ids = self._shown_ids
+		selected = [old_ids[i] for i in self._selection]
+
+		self._shown_ids = ids
+		self._items = FilteredItems(self._all_items, ids)
+
+		self._selection.clear()
+
+		for id_ in selected:
+			i = bisect.bisect_left(ids, id_)
+
+			if i < len(ids) and ids[i] == id_:
+				self._selection.add(i, i + 1)
+
+		self.refresh()
+
+		if on_done is not None:
+			on_done()
+
+	def _shift_selection(self, at: int, delta: int):
+		# the selected rows after `at` move with their items
+		moved = self._selection.ranges(at, None)
+
+		if not moved:
+			return
+
+		self._selection.remove(at, moved[-1][1])
+
+		for start, end in moved:
+			self._selection.add(start + delta, end + delta)
+
+
+class LogView(HasProvider, Widget):
+	"""
+	A read-only view of the latest lines of a stream (e.g. a tailed log).
+
+	Holds at most `capacity` lines, the oldest ones are dropped. Appended lines are buffered and written to the Tk text
+	once per frame in a single insert, trimming the lines beyond the capacity in a single delete, so the cost per frame
+	does not depend on the number of lines appended. The view follows the new lines while it is scrolled to the end, and
+	stays on the lines the user scrolled to otherwise.
+
+	Lines from another thread or a slow source are appended through a provider (see `HasProvider`).
+	"""
+
+	name = WidgetName.LogView
+	properties = []
+	supported_styles = SupportedStyles(True, True, True, True, True, False, True, True, False, False)
+	tk_class = 'Text'
+	poolable = False  # its text belongs to the Tk widget
+
+	frame_interval = 16  # ms between writes to the Tk text
+
+	# ---
+	def __init__(self, capacity: int = 10_000, scroll_listener: Callable[[float, float], Any] = None, **kwargs):
+		"""
+		:param capacity: Maximum number of lines kept.
+		:param scroll_listener: Called with the (first, last) fractions of the view, e.g. a scrollbar's `set`.
+		"""
+
+		super().__init__(**kwargs)
+
+		self.scroll_listener = scroll_listener
+
+		self._lines: Deque[str] = deque(maxlen=capacity)
+		self._pending: Deque[str] = deque(maxlen=capacity)  # lines not written to the Tk text yet
+		self._write_after = None
+
+	def create_tk_widget(self, tk_parent: TkWidget):
+		self._tk_widget = tk.Text(tk_parent, wrap=tk.NONE, undo=False, state=tk.DISABLED)
+
+	def post_create(self):
+		if self.scroll_listener is not None:
+			self._tk_widget.configure(yscrollcommand=self.scroll_listener)
+
+		self._pending = deque(self._lines, maxlen=self.capacity)
+		self.write_lines()
+
+	def detach(self):
+		if self._write_after is not None:
+			self.window.tk_win.after_cancel(self._write_after)
+			self._write_after = None
+
+		self._pending.clear()
+
+		return super().detach()
+
+	# ---
+	@property
+	def capacity(self) -> int:
+		return self._lines.maxlen
+
+	@property
+	def lines(self) -> Deque[str]:
+		return self._lines
+
+	@property
+	def count(self) -> int:
+		return len(self._lines)
+
+	@property
+	def following(self) -> bool:
+		"""Whether the view is scrolled to the end (and follows the new lines)."""
+
+		return self._tk_widget is None or self._tk_widget.yview()[1] >= 1.0
+
+	def append(self, line: str):
+		self.append_lines((line,))
+
+	def append_lines(self, lines: Iterable[str]):
+		"""Adds lines at the end (split on newlines, a trailing one is ignored), they are shown on the next frame."""
+
+		# one entry per line of the Tk text, so the capacity counts both the same
+		lines = [part for line in lines for part in str(line).removesuffix('\n').split('\n')]
+
+		self._lines.extend(lines)
+
+		if not self._rendered:
+			return
+
+		# bounded too, only the last `capacity` lines of a burst are written
+		self._pending.extend(lines)
+
+		if self._write_after is None:
+			self._write_after = self.window.tk_win.after(self.frame_interval, self.write_lines)
+
+	def clear(self):
+		self._lines.clear()
+		self._pending.clear()
+
+		if self._tk_widget is not None:
+			self._tk_widget.configure(state=tk.NORMAL)
+			self._tk_widget.delete('1.0', tk.END)
+			self._tk_widget.configure(state=tk.DISABLED)
+
+	def clear_loaded_items(self):
+		self.clear()
+
+	def append_loaded_items(self, items: List[str]):
+		self.append_lines(items)
+
+	def write_lines(self):
+		"""Writes the buffered lines to the Tk text now."""
+
+		self._write_after = None
+
+		pending = self._pending
+
+		if not pending or self._tk_widget is None:
+			return
+
+		text = self._tk_widget
+		following = self.following
+
+		text.configure(state=tk.NORMAL)
+		text.insert('end-1c', '\n'.join(pending) + '\n')
+
+		pending.clear()
+
+		# lines in the text, not counting the empty one after the last newline
+		overflow = int(text.index('end-1c').split('.')[0]) - 1 - self.capacity
+
+		# the top of the view stays on its line when the lines above it are deleted
+		if overflow > 0:
+			text.delete('1.0', f'{overflow + 1}.0')
+
+		text.configure(state=tk.DISABLED)
+
+		if following:
+			text.yview_moveto(1.0)
+
+	def scroll_to_end(self):
+		if self._tk_widget is not None:
+			self._tk_widget.yview_moveto(1.0)
+
+	def yview(self, *args):
+		"""Scrollbar protocol (see `tk.Text.yview`)."""
+
+		if self._tk_widget is not None:
+			return self._tk_widget.yview(*args)
 
+		return None
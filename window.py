@@ -1,24 +1,63 @@
 import tkinter as tk
 from abc import ABC, abstractmethod
-from typing import Tuple, Literal, List
+from typing import Tuple, Literal, List, Dict, Iterator
 
-from base_types import TkWindow
-from base_widget import PackProperties, PlaceProperties
+from base_types import TkWindow, Backend
+from base_widget import PackProperties, PlaceProperties, BaseWidget
 from compound_widget import CompoundWidget
+from fonts import FontRegistry
 from object import Object
+from option_db import OptionDatabase
+from pool import WidgetPool
+from scheduler import IdleFlusher
 from style import Theme, THEME
+from tracing import TRACER
+from ttk_style import TtkStyler
 from widget import Widget
 
 
 # base window
 class WindowLike(Object, ABC):
+	# ---
+	@property
+	def window(self) -> 'WindowLike':
+		return self
+
+	@property
+	def backend(self) -> Backend:
+		return Backend.Classic
+
+	@property
+	def option_db(self) -> OptionDatabase | None:
+		return None
+
+	@property
+	def tk_win(self) -> TkWindow:
+		return self._tk_win
+
+	@property
+	def fonts(self) -> FontRegistry:
+		return self._fonts
+
+	@property
+	def flusher(self) -> IdleFlusher:
+		return self._flusher
+
+	@property
+	def widget_pool(self) -> WidgetPool:
+		return self._widget_pool
+
 	# ---
 	def __init__(self, title: str, size: Tuple[int, int], pos: Tuple[int, int] = None):
 		super().__init__(None)
 
 		self._tk_win = self.create_tk_win()
+		self._fonts = FontRegistry(self._tk_win)
+		self._flusher = IdleFlusher(self._tk_win)
+		self._widget_pool = WidgetPool()
 
 		self._children: List[Tuple[Widget | CompoundWidget, str, PackProperties | PlaceProperties]] = []
+		self._children_spacing: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]] = {}
 
 		self.set_title(title)
 		self.set_size(size)
@@ -42,15 +81,36 @@ class WindowLike(Object, ABC):
 
 		self._tk_win.geometry(f'{size[0]}x{size[1]}+{pos[0]}+{pos[1]}')
 
+	def flush(self):
+		"""Applies all the pending property changes of the window's widgets now."""
+
+		self._flusher.flush()
+
 	# ---
 	def add_widget(self, widget: Widget | CompoundWidget, placement_method: Literal['place', 'pack'], ppts: PackProperties | PlaceProperties):
 		self._children.append((widget, placement_method, ppts))
 
+	def iter_widgets(self) -> Iterator[BaseWidget]:
+		"""Iterates over all the widgets of the window (depth-first)."""
+
+		stack: List[BaseWidget] = [_ for _, __, ___ in reversed(self._children)]
+
+		while stack:
+			widget = stack.pop()
+
+			yield widget
+
+			stack.extend(reversed(list(widget.iter_children())))
+
 	# ---
 	def show(self):
+		tracing = TRACER.enabled
+
+		if tracing:
+			start = TRACER.begin()
+
 		for _, __, ___ in self._children:
-			margin_x, margin_y = self.theme.margin_(_.style.margin)
-			pad_x, pad_y = self.theme.margin_(_.style.padding)
+			(margin_x, margin_y), (pad_x, pad_y) = self._children_spacing[_.id] = _.spacing()
 
 			if __ == 'pack':
 				assert isinstance(___, PackProperties)
@@ -76,6 +136,9 @@ class WindowLike(Object, ABC):
 			else:
 				raise ValueError(f'\'{__}\' is not a valid placement method.')
 
+		if tracing:
+			TRACER.end('layout', self, start)
+
 		self._tk_win.mainloop()
 
 
@@ -85,14 +148,86 @@ class MainWindow(WindowLike):
 	def theme(self) -> Theme:
 		return self._theme
 
-	def __init__(self, title: str, size: Tuple[int, int], theme: Theme = THEME):
+	@property
+	def backend(self) -> Backend:
+		return self._backend
+
+	@property
+	def ttk_styler(self) -> TtkStyler:
+		if self._ttk_styler is None:
+			self._ttk_styler = TtkStyler(self._tk_win, self._fonts, self._ttk_theme)
+
+		return self._ttk_styler
+
+	@property
+	def option_db(self) -> OptionDatabase | None:
+		return self._option_db
+
+	def __init__(
+			self,
+			title: str,
+			size: Tuple[int, int],
+			theme: Theme = THEME,
+			backend: Backend = Backend.Classic,
+			use_option_db: bool = False,
+			ttk_theme: str = None
+	):
+		"""
+		:param backend: Renders the widgets with classic Tk or ttk widgets.
+		:param ttk_theme: ttk theme switched to by the ttk backend, e.g. 'clam' (the native themes ignore most colors).
+		The current one is kept by default.
+		:param use_option_db: Installs the theme's styles into Tk's option database so that widgets using them unchanged
+		skip the style pass (classic backend).
+		"""
+
 		self._theme = theme
+		self._backend = backend
+		self._ttk_theme = ttk_theme
+		self._ttk_styler = None
+		self._option_db = None
 
 		super().__init__(title, size)
 
+		if use_option_db:
+			self._option_db = OptionDatabase(self._tk_win, self._fonts)
+
 	def create_tk_win(self):
 		_ = tk.Tk()
 
 		_.configure(bg=self.theme.color_('.bg'))
 
 		return _
+
+	def set_theme(self, theme: Theme):
+		"""
+		Switches the theme of the rendered window.
+
+		Only the Tk options that differ between the two themes are reconfigured, widgets whose options did not change
+		are skipped. Diffs are computed once per distinct pair of option tables and shared between widgets.
+		"""
+
+		if theme is self._theme:
+			return
+
+		self._theme = theme
+
+		self._tk_win.configure(bg=theme.color_('.bg'))
+
+		diff_cache = {}
+
+		for widget in self.iter_widgets():
+			widget.restyle(diff_cache)
+
+		for _, __, ___ in self._children:
+			old_spacing = self._children_spacing.get(_.id)
+
+			if old_spacing is None or not _.rendered:
+				continue
+
+			new_spacing = _.spacing()
+
+			if new_spacing != old_spacing:
+				(margin_x, margin_y), (pad_x, pad_y) = self._children_spacing[_.id] = new_spacing
+
+				# hidden widgets are not packed again, their saved options get the new spacing
+				_.configure_geometry(padx=margin_x, pady=margin_y, ipadx=pad_x, ipady=pad_y)